@@ -2,31 +2,52 @@
 Allergen checking with multilingual translation support.
 """
 from sqlalchemy.orm import Session
+import crud
 import models
 import translator
 import llm
 
-def check_recipe_allergens(recipe: models.Recipe, allergens: list[models.Allergen]) -> bool:
+def collect_keywords(allergens: list[models.Allergen]) -> list[str]:
     """
-    Check if a recipe contains any allergens using keyword detection 
-    and AI-based verification to prevent false positives.
+    Flattens the keyword lists of all allergens, falling back to the allergen name.
     """
-    if not allergens or not recipe.ingredients:
-        return False
-    
-    # Get all allergen keywords and names
     all_keywords = []
-    allergen_names = []
     for allergen in allergens:
-        allergen_names.append(allergen.name)
         all_keywords.extend(allergen.keywords or [allergen.name.lower()])
-    
+    return all_keywords
+
+def annotate_recipes(db: Session, recipes: list[models.Recipe], allergens: list[models.Allergen]):
+    """
+    Sets `has_allergens` on every recipe. A single SQL pass first narrows the page
+    down to recipes with a possible keyword hit; only those run the full check,
+    on ingredient texts loaded in one query (list pages skip the ingredients).
+    """
+    if not allergens:
+        for recipe in recipes:
+            recipe.has_allergens = False
+        return
+
+    # Flatten the keywords once per page instead of once per recipe
+    all_keywords = tuple(collect_keywords(allergens))
+    allergen_names = [allergen.name for allergen in allergens]
+
+    candidate_ids = crud.get_allergen_candidate_recipe_ids(
+        db, [recipe.id for recipe in recipes], all_keywords
+    )
+    texts_by_recipe = crud.get_ingredient_texts(db, candidate_ids)
+    translator.prefetch_translations([text for texts in texts_by_recipe.values() for text in texts])
+    for recipe in recipes:
+        recipe.has_allergens = recipe.id in candidate_ids and _texts_have_allergens(
+            texts_by_recipe.get(recipe.id, []), all_keywords, allergen_names
+        )
+
+def _texts_have_allergens(ingredient_texts: list[str], all_keywords: tuple[str, ...], allergen_names: list[str]) -> bool:
     # Check each ingredient
-    for ingredient in recipe.ingredients:
+    for text in ingredient_texts:
         # Stage 1: Fast keyword check
-        if translator.ingredient_contains_allergen(ingredient.text, all_keywords):
+        if translator.ingredient_contains_allergen(text, all_keywords):
             # Stage 2: AI verification to avoid false positives (like 'peanut butter' vs 'milk')
-            if llm.verify_allergens_with_ai(ingredient.text, allergen_names):
+            if llm.verify_allergens_with_ai(text, allergen_names):
                 return True
     
     return False
@@ -1,8 +1,18 @@
+import hashlib
+import logging
 import os
+import shutil
+import subprocess
+import time
 import uuid
 import requests
+from email.utils import formatdate
 from typing import Optional
 
+import cache
+
+logger = logging.getLogger("lmeals.assets")
+
 # Path configuration
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -13,9 +23,110 @@ else:
     STATIC_DIR = os.path.join(BASE_DIR, "static")
 
 IMAGES_DIR = os.path.join(STATIC_DIR, "images", "recipes")
+CANDIDATES_DIR = os.path.join(IMAGES_DIR, "candidates")
+
+# Content-addressed copies of downloaded images, keyed by source URL hash.
+# An entry's mtime is when it was last fetched or revalidated; its atime is
+# set on every reuse and drives the least-recently-used sweep.
+IMAGE_CACHE_DIR = os.path.join(IMAGES_DIR, "cache")
+IMAGE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("LMEALS_IMAGE_CACHE_MB", "200")) * 1024 * 1024
+
+# Downscaled WebP variants for recipe cards, named after the full image
+THUMBS_DIR = os.path.join(IMAGES_DIR, "thumbs")
+THUMBNAIL_WIDTH = 320
 
 # Ensure directory exists
 os.makedirs(IMAGES_DIR, exist_ok=True)
+os.makedirs(CANDIDATES_DIR, exist_ok=True)
+os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+os.makedirs(THUMBS_DIR, exist_ok=True)
+
+def _cached_image_path(url: str) -> Optional[str]:
+    """Returns the cached download for `url`, if any."""
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    for ext in (".jpg", ".png", ".webp", ".gif"):
+        path = os.path.join(IMAGE_CACHE_DIR, f"{key}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def _reuse_cached_image(url: str, cached: str) -> str:
+    os.utime(cached, (time.time(), os.path.getmtime(cached)))
+    relative_path = _publish_image(cached, os.path.splitext(cached)[1])
+    logger.debug("Reused cached image for %s -> %s", url, relative_path)
+    generate_thumbnail(relative_path)
+    return relative_path
+
+def prune_image_cache(max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+    """
+    Deletes the least recently used cache entries until the cache fits in
+    `max_bytes`. Recipes keep their own hard link, so their images survive.
+    """
+    entries = []
+    total = 0
+    try:
+        with os.scandir(IMAGE_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith(".part") or not entry.is_file():
+                    continue
+                st = entry.stat()
+                entries.append((st.st_atime, st.st_size, entry.path))
+                total += st.st_size
+    except FileNotFoundError:
+        return
+    if total <= max_bytes:
+        return
+
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        if total <= max_bytes:
+            break
+    logger.debug("Pruned image cache to %d bytes", total)
+
+def _publish_image(source_path: str, ext: str) -> str:
+    """
+    Gives a recipe its own file (hard link, or copy as a fallback) so that
+    deleting one recipe's image never affects another or the cache.
+    """
+    filename = f"{uuid.uuid4()}{ext}"
+    filepath = os.path.join(IMAGES_DIR, filename)
+    try:
+        os.link(source_path, filepath)
+    except OSError:
+        shutil.copyfile(source_path, filepath)
+    return f"images/recipes/{filename}"
+
+def promote_candidate(source_path: str, dest_path: str, keep_source: bool = False):
+    """
+    Moves a candidate image into permanent storage. Both live on the same
+    filesystem, so this is a rename (or a hard link when the candidate is
+    still needed) rather than a copy of the file contents.
+    """
+    try:
+        if keep_source:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            os.link(source_path, dest_path)
+        else:
+            os.replace(source_path, dest_path)
+    except OSError:
+        shutil.copy2(source_path, dest_path)
+        if not keep_source:
+            os.remove(source_path)
+
+# Image downloads run in worker threads; one session keeps connections to
+# the same CDN alive between them
+_image_session = requests.Session()
+_image_session.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
+})
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
 
 def download_image(url: str) -> Optional[str]:
     """
@@ -31,14 +142,28 @@ def download_image(url: str) -> Optional[str]:
         if url.startswith("images/recipes/"):
             return url
             
-        print(f"DEBUG: Downloading image from {url}")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8',
-        }
+        cached = _cached_image_path(url)
+        headers = {}
+        if cached:
+            fetched_at = os.path.getmtime(cached)
+            if time.time() - fetched_at < IMAGE_CACHE_TTL_SECONDS:
+                return _reuse_cached_image(url, cached)
+            headers["If-Modified-Since"] = formatdate(fetched_at, usegmt=True)
+
+        logger.debug("Downloading image from %s", url)
         
-        response = requests.get(url, headers=headers, stream=True, timeout=10)
+        try:
+            response = _image_session.get(url, stream=True, timeout=10, headers=headers)
+        except requests.RequestException as e:
+            if not cached:
+                raise
+            logger.warning("Revalidating cached image for %s failed, using it anyway: %s", url, e)
+            return _reuse_cached_image(url, cached)
+        if cached and response.status_code == 304:
+            response.close()
+            now = time.time()
+            os.utime(cached, (now, now))
+            return _reuse_cached_image(url, cached)
         response.raise_for_status()
         
         # Determine file extension (default to jpg if unknown)
@@ -53,25 +178,95 @@ def download_image(url: str) -> Optional[str]:
         elif "jpeg" in content_type:
             ext = ".jpg"
             
-        # Generate unique filename
-        filename = f"{uuid.uuid4()}{ext}"
-        filepath = os.path.join(IMAGES_DIR, filename)
-        
-        # Save file
-        with open(filepath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Save into the cache via a temp file so readers never see a partial image
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(IMAGE_CACHE_DIR, f"{key}{ext}")
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.part"
+        try:
+            with response, open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if cached and cached != cache_path:
+            # The image changed type upstream; drop the old copy
+            os.remove(cached)
+        prune_image_cache()
                 
         # Return the relative path for the frontend
-        relative_path = f"images/recipes/{filename}"
-        print(f"DEBUG: Image saved to {relative_path}")
+        relative_path = _publish_image(cache_path, ext)
+        logger.debug("Image saved to %s", relative_path)
+        generate_thumbnail(relative_path)
         return relative_path
         
+    except Exception:
+        logger.exception("Failed to download image from %s", url)
+        return None
+
+def _thumbnail_relative_path(relative_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(relative_path))[0]
+    return f"images/recipes/thumbs/{stem}.webp"
+
+def generate_thumbnail(relative_path: str) -> Optional[str]:
+    """
+    Writes a THUMBNAIL_WIDTH-wide WebP variant of a local recipe image using
+    ffmpeg (already required for video frames). Returns its relative path,
+    or None if the image is remote or conversion fails.
+    """
+    if not relative_path or relative_path.startswith("http"):
+        return None
+
+    source = os.path.join(IMAGES_DIR, os.path.basename(relative_path))
+    thumb_relative = _thumbnail_relative_path(relative_path)
+    target = os.path.join(THUMBS_DIR, os.path.basename(thumb_relative))
+    cmd = [
+        'ffmpeg',
+        '-i', source,
+        '-vf', f"scale='min({THUMBNAIL_WIDTH},iw)':-2",
+        '-quality', '75',
+        '-y',
+        target
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            logger.warning("Thumbnail generation failed for %s: %s", relative_path, result.stderr[-300:])
+            return None
     except Exception as e:
-        print(f"DEBUG: Failed to download image from {url}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.warning("Thumbnail generation error for %s: %s", relative_path, e)
+        return None
+    # Cached recipe bodies and ETags were built without image_url_small
+    cache.bump_recipe_version()
+    return thumb_relative
+
+def get_thumbnail(relative_path: Optional[str]) -> Optional[str]:
+    """Returns the thumbnail for a local recipe image if one has been generated."""
+    if not relative_path or relative_path.startswith("http"):
         return None
+    thumb_relative = _thumbnail_relative_path(relative_path)
+    if os.path.exists(os.path.join(THUMBS_DIR, os.path.basename(thumb_relative))):
+        return thumb_relative
+    return None
+
+def delete_candidates(relative_paths: list[str]):
+    """
+    Deletes gallery candidates in a single pass over the candidates directory.
+    """
+    wanted = {os.path.basename(p) for p in relative_paths if p}
+    if not wanted:
+        return
+    try:
+        with os.scandir(CANDIDATES_DIR) as entries:
+            for entry in entries:
+                if entry.name in wanted:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+    except FileNotFoundError:
+        pass
 
 def delete_image(relative_path: str):
     """
@@ -87,9 +282,13 @@ def delete_image(relative_path: str):
         
         if os.path.exists(filepath):
             os.remove(filepath)
-            print(f"DEBUG: Deleted local image {filepath}")
+            logger.debug("Deleted local image %s", filepath)
+
+            thumb_path = os.path.join(THUMBS_DIR, os.path.basename(_thumbnail_relative_path(relative_path)))
+            if os.path.exists(thumb_path):
+                os.remove(thumb_path)
         else:
-            print(f"DEBUG: File not found for deletion: {filepath}")
+            logger.debug("File not found for deletion: %s", filepath)
             
     except Exception as e:
-        print(f"DEBUG: Error deleting image {relative_path}: {e}")
+        logger.warning("Error deleting image %s: %s", relative_path, e)
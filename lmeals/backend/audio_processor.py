@@ -1,15 +1,28 @@
 import yt_dlp
+import copy
+import io
+import logging
 import os
 import math
+import re
+import subprocess
 from pydub import AudioSegment
+from pydub.silence import detect_silence
 import uuid
 import requests
 import threading
 import time
 import shutil
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, Comment
 import PyPDF2  # Ensure this is in requirements.txt or handle ImportError
 
+import assets
+import cache
+
+logger = logging.getLogger("lmeals.audio_processor")
+
 def get_common_ydl_opts():
     """BASE yt-dlp options to avoid 403 Forbidden errors."""
     return {
@@ -46,7 +59,28 @@ def get_highres_ydl_opts():
     }
 
 def get_video_metadata(url: str):
-    """Extracts title, thumbnail, and checks for existing subtitles."""
+    """
+    Extracts title, thumbnail, and checks for existing subtitles.
+    Successful extractions are cached per URL for a few minutes.
+    """
+    cached = cache.video_metadata_cache.get(url)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    metadata = _extract_video_metadata(url)
+    if metadata is not None:
+        cache.video_metadata_cache.set(url, copy.deepcopy(metadata))
+        return metadata
+    return {
+        "title": "Video Recipe",
+        "thumbnail": None,
+        "subtitles": {},
+        "automatic_captions": {},
+        "description": "",
+        "duration": 0
+    }
+
+def _extract_video_metadata(url: str) -> dict | None:
     ydl_opts = get_common_ydl_opts()
     ydl_opts.update({
         'skip_download': True,
@@ -66,21 +100,74 @@ def get_video_metadata(url: str):
                 "title": info.get("title", "Video Recipe"),
                 "thumbnail": info.get("thumbnail"),
                 "subtitles": info.get("subtitles", {}),
+                "automatic_captions": info.get("automatic_captions") or {},
                 "description": info.get("description", ""),
                 "duration": info.get("duration", 0)
             }
     except Exception as e:
-        print(f"Error extracting metadata: {e}")
-        return {
-            "title": "Video Recipe",
-            "thumbnail": None,
-            "subtitles": {},
-            "description": "",
-            "duration": 0
-        }
+        logger.warning("Error extracting metadata: %s", e)
+        return None
+
+_ENGLISH_TRACK = re.compile(r'^en(?:[-_].*)?$')
+
+def _subtitle_track_url(metadata: dict) -> str | None:
+    """
+    Picks an English VTT track from already-extracted metadata, preferring
+    uploaded subtitles over automatic captions (same order as yt-dlp's).
+    """
+    for tracks in (metadata.get("subtitles") or {}, metadata.get("automatic_captions") or {}):
+        for lang in sorted(tracks, key=lambda l: l != "en"):
+            if not _ENGLISH_TRACK.match(lang):
+                continue
+            for fmt in tracks[lang] or []:
+                if fmt.get("ext") == "vtt" and fmt.get("url"):
+                    return fmt["url"]
+    return None
+
+def _clean_subtitles(content: str) -> str:
+    """Strips VTT/SRT headers, timestamps and tags, and collapses repeated lines."""
+    # Remove WEBVTT header
+    content = re.sub(r'WEBVTT.*?\n', '', content, flags=re.DOTALL)
+    # Remove timestamps (00:00:00.000 -> 00:00:00.000)
+    content = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3} --> \d{2}:\d{2}:\d{2}\.\d{3}.*?\n', '', content)
+    # Remove line numbers and tags
+    content = re.sub(r'<.*?>', '', content)
+    content = re.sub(r'^\d+\n', '', content, flags=re.MULTILINE)
+    
+    # Deduplicate repeated lines (common in YouTube auto-subs)
+    lines = content.splitlines()
+    clean_lines = []
+    for line in lines:
+        line = line.strip()
+        if line and (not clean_lines or line != clean_lines[-1]):
+            clean_lines.append(line)
+    return " ".join(clean_lines)
+
+def get_subtitle_text(url: str, metadata: dict | None = None) -> str:
+    """
+    Attempts to download and extract text from subtitles/captions.
+    With the metadata from get_video_metadata, the caption track is fetched
+    directly instead of running a second yt-dlp extraction.
+    """
+    cached = cache.subtitle_cache.get(url)
+    if cached is not None:
+        return cached
+
+    text = _fetch_subtitle_text(url, metadata)
+    if text:
+        cache.subtitle_cache.set(url, text)
+    return text
+
+def _fetch_subtitle_text(url: str, metadata: dict | None) -> str:
+    track_url = _subtitle_track_url(metadata) if metadata else None
+    if track_url:
+        try:
+            response = requests.get(track_url, headers=get_common_ydl_opts()["http_headers"], timeout=30)
+            response.raise_for_status()
+            return _clean_subtitles(response.text)
+        except Exception as e:
+            logger.warning("Error fetching subtitle track, falling back to yt-dlp: %s", e)
 
-def get_subtitle_text(url: str) -> str:
-    """Attempts to download and extract text from subtitles/captions."""
     output_dir = "temp_subs"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -100,40 +187,36 @@ def get_subtitle_text(url: str) -> str:
             ydl.download([url])
             
         # Find the downloaded subtitle file
-        import re
         for f in os.listdir(output_dir):
             if f.startswith(file_id) and f.endswith(('.vtt', '.srt')):
                 file_path = os.path.join(output_dir, f)
                 with open(file_path, 'r', encoding='utf-8') as sf:
                     content = sf.read()
                     
-                # Clean up VTT/SRT tags and timestamps
-                # Remove WEBVTT header
-                content = re.sub(r'WEBVTT.*?\n', '', content, flags=re.DOTALL)
-                # Remove timestamps (00:00:00.000 -> 00:00:00.000)
-                content = re.sub(r'\d{2}:\d{2}:\d{2}\.\d{3} --> \d{2}:\d{2}:\d{2}\.\d{3}.*?\n', '', content)
-                # Remove line numbers and tags
-                content = re.sub(r'<.*?>', '', content)
-                content = re.sub(r'^\d+\n', '', content, flags=re.MULTILINE)
-                
-                # Deduplicate repeated lines (common in YouTube auto-subs)
-                lines = content.splitlines()
-                clean_lines = []
-                for line in lines:
-                    line = line.strip()
-                    if line and (not clean_lines or line != clean_lines[-1]):
-                        clean_lines.append(line)
-                
                 # Cleanup temp file
                 os.remove(file_path)
-                return " ".join(clean_lines)
+                return _clean_subtitles(content)
     except Exception as e:
-        print(f"Error fetching subtitles: {e}")
+        logger.warning("Error fetching subtitles: %s", e)
         
     return ""
 
+# Whisper resamples everything to 16 kHz mono, so a speech-grade encode loses
+# nothing and makes the file (and each decode of it) several times smaller
+SPEECH_SAMPLE_RATE = 16000
+SPEECH_BITRATE_KBPS = 64
+# Speech sped up 1.5x transcribes about as accurately and is billed per
+# second. 1 disables it; atempo accepts up to 2 in older ffmpeg builds.
+SPEEDUP_FACTOR = min(max(float(os.getenv("SPEEDUP_FACTOR", "1.5")), 1.0), 2.0)
+
+def _speech_audio_args() -> list[str]:
+    args = ['-ac', '1', '-ar', str(SPEECH_SAMPLE_RATE)]
+    if SPEEDUP_FACTOR > 1.0:
+        args += ['-filter:a', f'atempo={SPEEDUP_FACTOR:g}']
+    return args
+
 def download_audio(url: str, output_dir: str = "temp_audio") -> str:
-    """Downloads audio from a URL and returns the path to the MP3 file."""
+    """Downloads audio from a URL and returns the path to a speech-grade MP3 file."""
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         
@@ -146,8 +229,9 @@ def download_audio(url: str, output_dir: str = "temp_audio") -> str:
         'postprocessors': [{
             'key': 'FFmpegExtractAudio',
             'preferredcodec': 'mp3',
-            'preferredquality': '192',
+            'preferredquality': str(SPEECH_BITRATE_KBPS),
         }],
+        'postprocessor_args': {'extractaudio': _speech_audio_args()},
         'outtmpl': output_template,
         'noplaylist': True,
     })
@@ -155,28 +239,47 @@ def download_audio(url: str, output_dir: str = "temp_audio") -> str:
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             ydl.download([url])
-    except Exception as e:
-        print(f"Error downloading audio: {e}")
+    except Exception:
+        logger.exception("Error downloading audio")
         return ""
         
     final_path = os.path.join(output_dir, f"{file_id}.mp3")
     if os.path.exists(final_path):
         if os.path.getsize(final_path) == 0:
-            print(f"ERROR: Downloaded audio file is empty: {final_path}")
+            logger.error("Downloaded audio file is empty: %s", final_path)
             os.remove(final_path)
             return ""
         return final_path
     else:
         return ""
 
-def chunk_audio(file_path: str, max_size_mb: int = 24) -> list[str]:
-    """Splits an audio file into chunks smaller than max_size_mb."""
+def _find_cut_point(audio: AudioSegment, target_ms: float, window_ms: int = 2000) -> float:
+    """
+    Moves a chunk boundary to the middle of the pause closest to `target_ms`,
+    so words aren't split between two transcription requests. Only a small
+    window around the boundary is scanned; falls back to `target_ms`.
+    """
+    start = max(0, int(target_ms - window_ms))
+    window = audio[start:int(target_ms + window_ms)]
+    silences = detect_silence(window, min_silence_len=200, silence_thresh=window.dBFS - 16, seek_step=10)
+    if not silences:
+        return target_ms
+    mid_points = [start + (s + e) / 2 for s, e in silences]
+    return min(mid_points, key=lambda m: abs(m - target_ms))
+
+def chunk_audio(file_path: str, max_size_mb: int = 24) -> list[tuple[str, bytes]]:
+    """
+    Splits an audio file into in-memory (filename, mp3 bytes) chunks smaller
+    than max_size_mb, ready to upload. Nothing is written back to disk.
+    """
     if not file_path or not os.path.exists(file_path):
         return []
     
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
     file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
     if file_size_mb <= max_size_mb:
-        return [file_path]
+        with open(file_path, "rb") as f:
+            return [(f"{base_name}.mp3", f.read())]
     
     audio = AudioSegment.from_mp3(file_path)
     # Estimate chunk duration based on data rate
@@ -185,17 +288,18 @@ def chunk_audio(file_path: str, max_size_mb: int = 24) -> list[str]:
     chunk_ms = total_ms / num_chunks
     
     chunks = []
-    base_dir = os.path.dirname(file_path)
-    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    
+    # Cut at pauses near the even split points
+    bounds = [0] + [_find_cut_point(audio, i * chunk_ms) for i in range(1, num_chunks)] + [total_ms]
     
     for i in range(num_chunks):
-        start_ms = i * chunk_ms
-        end_ms = min((i + 1) * chunk_ms, total_ms)
+        start_ms = bounds[i]
+        end_ms = bounds[i + 1]
         chunk = audio[start_ms:end_ms]
         
-        chunk_path = os.path.join(base_dir, f"{base_name}_part{i}.mp3")
-        chunk.export(chunk_path, format="mp3")
-        chunks.append(chunk_path)
+        buffer = io.BytesIO()
+        chunk.export(buffer, format="mp3", bitrate=f"{SPEECH_BITRATE_KBPS}k")
+        chunks.append((f"{base_name}_part{i}.mp3", buffer.getvalue()))
         
     return chunks
 
@@ -206,25 +310,107 @@ def cleanup_files(files: list[str]):
         if not f: continue
         # Handle both relative paths and absolute paths
         if not f.startswith('/') and not (len(f) > 1 and f[1] == ':'):
-            import assets
             f = os.path.join(assets.STATIC_DIR, f)
             
         if os.path.exists(f):
             try:
                 os.remove(f)
-                print(f"DEBUG: Cleaned up temp file {f}")
+                logger.debug("Cleaned up temp file %s", f)
             except:
                 pass
 
+def _extract_frame(video_path: str, ts: float, output_path: str) -> bool:
+    """
+    Extracts a single frame at `ts` seconds with ffmpeg. Returns True if the image was written.
+    """
+    # Use -ss BEFORE -i for faster seeking
+    cmd = [
+        'ffmpeg',
+        '-ss', str(ts),
+        '-i', video_path,
+        '-frames:v', '1',
+        '-q:v', '4',
+        '-y',
+        output_path
+    ]
+    
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        if result.returncode != 0:
+            logger.warning("ffmpeg failed for timestamp %ss: %s", ts, result.stderr)
+    except subprocess.TimeoutExpired:
+        logger.warning("ffmpeg timed out for timestamp %ss", ts)
+    except Exception as fe:
+        logger.warning("ffmpeg error: %s", fe)
+    return os.path.exists(output_path)
+
+# showinfo logs one line per frame that reaches the output, in write order
+_SHOWINFO_PTS = re.compile(r'Parsed_showinfo\S*\s.*?\bpts_time:\s*(-?[\d.]+)')
+
+def _extract_frames_single_pass(video_path: str, outputs: list[tuple[float, str]]) -> list[bool]:
+    """
+    Extracts the frame at each timestamp in one ffmpeg decode pass using the
+    select filter, instead of one process (and demuxer setup) per timestamp.
+    `outputs` must be sorted by timestamp without duplicates. Returns which
+    outputs were written.
+    """
+    # Pick the first frame at or after each timestamp
+    expr = "+".join(f"gte(t,{ts})*(lt(prev_selected_t,{ts})+isnan(prev_selected_t))" for ts, _ in outputs)
+    output_dir = os.path.dirname(outputs[0][1])
+    temp_prefix = f".{uuid.uuid4().hex}_"
+    temp_pattern = os.path.join(output_dir, temp_prefix + "%d.jpg")
+    cmd = [
+        'ffmpeg',
+        '-t', str(outputs[-1][0] + 1),
+        '-i', video_path,
+        '-vf', f"select='{expr}',showinfo",
+        '-fps_mode', 'vfr',
+        '-q:v', '4',
+        '-y',
+        temp_pattern,
+    ]
+    stderr = ""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        stderr = result.stderr
+        if result.returncode != 0:
+            logger.warning("Single-pass ffmpeg frame capture failed: %s", result.stderr[-500:])
+    except Exception as fe:
+        logger.warning("Single-pass ffmpeg error: %s", fe)
+
+    # Files are numbered in write order, which is not one per timestamp: two
+    # timestamps can select the same frame, and ones past the end of the clip
+    # select nothing. Each frame's pts tells which timestamps it satisfied
+    # (those after the previous frame, up to its own pts); it is kept for the
+    # earliest of them.
+    written = [False] * len(outputs)
+    previous_pts = float("-inf")
+    for number, match in enumerate(_SHOWINFO_PTS.finditer(stderr), start=1):
+        pts = float(match.group(1))
+        covered = [i for i, (ts, _) in enumerate(outputs) if previous_pts < ts <= pts + 1e-3]
+        previous_pts = pts
+        temp_path = temp_pattern % number
+        if covered and os.path.exists(temp_path):
+            os.replace(temp_path, outputs[covered[0]][1])
+            written[covered[0]] = True
+
+    # Anything left over could not be matched to a timestamp
+    for name in os.listdir(output_dir):
+        if name.startswith(temp_prefix):
+            try:
+                os.remove(os.path.join(output_dir, name))
+            except OSError:
+                pass
+    return written
+
+# Length of the low-res clip downloaded for candidate frames
+_FRAME_CLIP_SECONDS = 20
+
 def capture_video_frames(url: str, timestamps: list[float] = [1.0, 5, 10, 15]) -> list[str]:
     """
     Downloads the first 20 seconds of a video and extracts frames at specified timestamps.
     Returns a list of relative paths to the extracted images.
     """
-    import subprocess
-    import shutil
-    import assets
-    
     # 1. Setup paths
     candidates_dir = os.path.join(assets.STATIC_DIR, "images", "recipes", "candidates")
     os.makedirs(candidates_dir, exist_ok=True)
@@ -241,13 +427,13 @@ def capture_video_frames(url: str, timestamps: list[float] = [1.0, 5, 10, 15]) -
         'format': 'best[height<=360]/worst',  # Prefer low res for frames
         'outtmpl': video_path_template,
         'noplaylist': True,
-        'download_ranges': lambda _, __: [{'start_time': 0, 'end_time': 20}],
+        'download_ranges': lambda _, __: [{'start_time': 0, 'end_time': _FRAME_CLIP_SECONDS}],
         'force_keyframes_at_cuts': True,
     })
     
     downloaded_video_path = None
     try:
-        print(f"DEBUG: Attempting to download video clip for frames: {url}")
+        logger.debug("Attempting to download video clip for frames: %s", url)
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             ydl.download([url])
             
@@ -258,43 +444,34 @@ def capture_video_frames(url: str, timestamps: list[float] = [1.0, 5, 10, 15]) -
                 break
                 
         if not downloaded_video_path:
-            print("ERROR: Could not find downloaded video clip (or download failed).")
+            logger.error("Could not find downloaded video clip (or download failed)")
             return []
 
-        # 3. Extract frames using ffmpeg
-        extracted_paths = []
-        for ts in timestamps:
-            output_filename = f"{unique_id}_frame_{ts}s.jpg"
-            output_path = os.path.join(candidates_dir, output_filename)
-            
-            # Use -ss BEFORE -i for faster seeking
-            cmd = [
-                'ffmpeg',
-                '-ss', str(ts),
-                '-i', downloaded_video_path,
-                '-frames:v', '1',
-                '-q:v', '4',
-                '-y',
-                output_path
-            ]
-            
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode != 0:
-                    print(f"WARNING: ffmpeg failed for timestamp {ts}s: {result.stderr}")
-                
-                if os.path.exists(output_path):
-                    relative_path = f"images/recipes/candidates/{output_filename}"
-                    extracted_paths.append(relative_path)
-            except subprocess.TimeoutExpired:
-                print(f"WARNING: ffmpeg timed out for timestamp {ts}s")
-            except Exception as fe:
-                print(f"WARNING: ffmpeg error: {fe}")
-                
+        # 3. Extract all frames in one ffmpeg decode pass. Duplicate timestamps
+        # would share a frame, and ones outside the clip can't be captured.
+        stamps = sorted({float(ts) for ts in timestamps if 0 <= float(ts) < _FRAME_CLIP_SECONDS})
+        outputs = [(ts, f"{unique_id}_frame_{ts:g}s.jpg") for ts in stamps]
+        if not outputs:
+            return []
+        extracted = _extract_frames_single_pass(
+            downloaded_video_path, [(ts, os.path.join(candidates_dir, name)) for ts, name in outputs]
+        )
+        if not any(extracted):
+            # Older ffmpeg builds: fall back to one seek per timestamp, in parallel
+            with ThreadPoolExecutor(max_workers=len(outputs)) as executor:
+                extracted = list(executor.map(
+                    lambda item: _extract_frame(downloaded_video_path, item[0], os.path.join(candidates_dir, item[1])),
+                    outputs,
+                ))
+
+        extracted_paths = [
+            f"images/recipes/candidates/{output_filename}"
+            for (ts, output_filename), ok in zip(outputs, extracted) if ok
+        ]
         return extracted_paths
         
-    except Exception as e:
-        print(f"ERROR capturing video frames: {e}")
+    except Exception:
+        logger.exception("Error capturing video frames")
         return []
     finally:
         # 4. Cleanup temp video directory
@@ -307,9 +484,6 @@ def download_high_res_frame(url: str, timestamp: float, output_path: str) -> boo
     Downloads a short clip around the timestamp at high resolution (max 1440p)
     and extracts the specific frame to replace the low-res candidate.
     """
-    import subprocess
-    import shutil
-    
     # 1. Setup temp directory
     temp_dir = os.path.join(os.getcwd(), f"temp_hires_{uuid.uuid4()}")
     os.makedirs(temp_dir, exist_ok=True)
@@ -334,7 +508,7 @@ def download_high_res_frame(url: str, timestamp: float, output_path: str) -> boo
     
     downloaded_video_path = None
     try:
-        print(f"DEBUG: Downloading high-res clip for frame at {timestamp}s (max 1440p)...")
+        logger.debug("Downloading high-res clip for frame at %ss (max 1440p)", timestamp)
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             ydl.download([url])
             
@@ -345,7 +519,7 @@ def download_high_res_frame(url: str, timestamp: float, output_path: str) -> boo
                 break
                 
         if not downloaded_video_path:
-            print("ERROR: High-res video download failed.")
+            logger.error("High-res video download failed")
             return False
 
         # 3. Extract the SPECIFIC frame
@@ -363,14 +537,14 @@ def download_high_res_frame(url: str, timestamp: float, output_path: str) -> boo
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         if result.returncode != 0:
-            print(f"WARNING: High-res ffmpeg failed: {result.stderr}")
+            logger.warning("High-res ffmpeg failed: %s", result.stderr)
             return False
             
-        print(f"DEBUG: Successfully captured high-res frame at {output_path}")
+        logger.debug("Successfully captured high-res frame at %s", output_path)
         return True
         
-    except Exception as e:
-        print(f"ERROR downloading high-res frame: {e}")
+    except Exception:
+        logger.exception("Error downloading high-res frame")
         return False
     finally:
         if os.path.exists(temp_dir):
@@ -384,11 +558,11 @@ def scrape_recipe_from_link(url: str) -> dict | None:
     For PDFs: Downloads, extracts text, schedules cleanup after 10 seconds.
     """
     try:
-        print(f"DEBUG: Scraping recipe from {url}")
+        logger.debug("Scraping recipe from %s", url)
         
         # Check if it's a PDF
         if url.lower().endswith('.pdf'):
-            print("DEBUG: Detected PDF link, downloading...")
+            logger.debug("Detected PDF link, downloading")
             temp_pdf = f"temp_{uuid.uuid4().hex}.pdf"
             
             response = requests.get(url, timeout=30)
@@ -397,7 +571,7 @@ def scrape_recipe_from_link(url: str) -> dict | None:
             with open(temp_pdf, 'wb') as f:
                 f.write(response.content)
             
-            print(f"DEBUG: PDF downloaded to {temp_pdf}")
+            logger.debug("PDF downloaded to %s", temp_pdf)
             
             # Extract text from PDF
             try:
@@ -409,7 +583,7 @@ def scrape_recipe_from_link(url: str) -> dict | None:
                         if extracted:
                             pdf_text += extracted + "\n"
                 
-                print(f"DEBUG: Extracted {len(pdf_text)} characters from PDF")
+                logger.debug("Extracted %s characters from PDF", len(pdf_text))
                 
                 # Extract images from PDF using pdf2image (if available) or PyMuPDF/fitz is better but let's stick to what we might have or keep it simple.
                 # Actually, extracting images from PDF is tricky without heavy libraries like fitz or pdf2image + poppler.
@@ -427,9 +601,9 @@ def scrape_recipe_from_link(url: str) -> dict | None:
                     try:
                         if os.path.exists(temp_pdf):
                             os.unlink(temp_pdf)
-                            print(f"DEBUG: Cleaned up PDF: {temp_pdf}")
+                            logger.debug("Cleaned up PDF: %s", temp_pdf)
                     except Exception as e:
-                        print(f"ERROR cleaning up PDF: {e}")
+                        logger.warning("Error cleaning up PDF: %s", e)
                 
                 cleanup_thread = threading.Thread(target=cleanup_pdf, daemon=True)
                 cleanup_thread.start()
@@ -441,12 +615,12 @@ def scrape_recipe_from_link(url: str) -> dict | None:
                 }
                 
             except ImportError:
-                print("ERROR: PyPDF2 not installed. Cannot extract PDF text.")
+                logger.error("PyPDF2 not installed, cannot extract PDF text")
                 if os.path.exists(temp_pdf):
                     os.unlink(temp_pdf)
                 return None
-            except Exception as e:
-                print(f"ERROR extracting PDF text: {e}")
+            except Exception:
+                logger.exception("Error extracting PDF text")
                 if os.path.exists(temp_pdf):
                     os.unlink(temp_pdf)
                 return None
@@ -458,14 +632,13 @@ def scrape_recipe_from_link(url: str) -> dict | None:
         response = requests.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
         
         # Clean up the HTML to reduce token usage (fix for 413 Rate Limit)
         for tag in soup(["script", "style", "svg", "noscript", "iframe", "header", "footer", "nav", "aside", "form"]):
             tag.decompose()
             
         # Remove comments
-        from bs4 import Comment
         for comment in soup.find_all(text=lambda text: isinstance(text, Comment)):
             comment.extract()
             
@@ -490,16 +663,15 @@ def scrape_recipe_from_link(url: str) -> dict | None:
         
         # Absolute URL handling
         if image_url and not image_url.startswith('http'):
-            from urllib.parse import urljoin
             image_url = urljoin(url, image_url)
             
-        print(f"DEBUG: Found image URL: {image_url}")
+        logger.debug("Found image URL: %s", image_url)
         
         return {
             "image_url": image_url,
             "html": str(content_soup)
         }
         
-    except Exception as e:
-        print(f"ERROR scraping recipe link: {e}")
+    except Exception:
+        logger.exception("Error scraping recipe link")
         return None
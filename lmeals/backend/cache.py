@@ -0,0 +1,182 @@
+"""
+Small in-process caches shared by the routers.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import crud
+import models
+from database import SessionLocal
+
+class TTLCache:
+    """
+    Thread-safe LRU dict whose entries expire after `ttl` seconds.
+    """
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+def content_key(*parts: str) -> str:
+    """Short BLAKE2b digest used to key caches by URL or page content."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update((part or "").encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+# Scraping and AI extraction are slow and billed, so re-scrapes of the same
+# URL or identical HTML (mirrors, reloads) are served from memory. Failed
+# extractions are remembered briefly so retries don't hammer the rate limit.
+HTML_CACHE_TTL = 24 * 3600
+EXTRACTION_CACHE_TTL = 24 * 3600
+EXTRACTION_FAILURE_TTL = 120
+
+html_cache = TTLCache(maxsize=64, ttl=HTML_CACHE_TTL)
+extraction_cache = TTLCache(maxsize=256, ttl=EXTRACTION_CACHE_TTL)
+extraction_failures = TTLCache(maxsize=256, ttl=EXTRACTION_FAILURE_TTL)
+
+# yt-dlp extractions take seconds; retries and repeat imports of the same video
+# reuse the metadata and caption text for a few minutes
+VIDEO_METADATA_TTL = 600
+video_metadata_cache = TTLCache(maxsize=512, ttl=VIDEO_METADATA_TTL)
+subtitle_cache = TTLCache(maxsize=128, ttl=VIDEO_METADATA_TTL)
+
+# Setting values (API key, model names) are read on every LLM call but change
+# rarely. Writes in this process invalidate immediately; the TTL covers others.
+SETTINGS_CACHE_TTL = 60
+_setting_values = TTLCache(maxsize=128, ttl=SETTINGS_CACHE_TTL)
+_MISSING = object()
+
+def get_setting_value(key: str, db: Session | None = None) -> str | None:
+    """
+    Returns a setting's value (None if unset), hitting the database only on a
+    cache miss. Opens a short-lived session when the caller has none.
+    """
+    value = _setting_values.get(key, _MISSING)
+    if value is _MISSING:
+        if db is None:
+            with SessionLocal() as session:
+                setting = crud.get_setting(session, key)
+        else:
+            setting = crud.get_setting(db, key)
+        value = setting.value if setting else None
+        _setting_values.set(key, value)
+    return value
+
+@event.listens_for(models.Setting, "after_insert")
+@event.listens_for(models.Setting, "after_update")
+@event.listens_for(models.Setting, "after_delete")
+def _invalidate_setting(mapper, connection, target):
+    _setting_values.pop(target.key)
+
+# Groq's model list, keyed by a digest of the API key so keys never share
+# (or store) each other's results. It changes rarely.
+GROQ_MODELS_TTL = 3600
+groq_models_cache = TTLCache(maxsize=16, ttl=GROQ_MODELS_TTL)
+
+# AI allergen verdicts keyed by (ingredient text, allergen names). Recipe lists
+# re-check the same keyword hits on every render, so each pair is asked once.
+ALLERGEN_VERDICT_TTL = 24 * 3600
+allergen_verdicts = TTLCache(maxsize=4096, ttl=ALLERGEN_VERDICT_TTL)
+
+# Allergens only change through the allergen router, which bumps this version.
+# The TTL bounds staleness when several worker processes each hold a copy.
+ALLERGEN_CACHE_TTL = 60
+
+_allergen_lock = threading.Lock()
+_allergen_cache = {"data": None, "version": 0, "loaded_version": -1, "loaded_at": 0.0}
+
+def bump_allergen_version():
+    """Invalidates the cached allergen list after a create/update/delete."""
+    with _allergen_lock:
+        _allergen_cache["version"] += 1
+
+def get_allergen_version() -> int:
+    with _allergen_lock:
+        return _allergen_cache["version"]
+
+def get_cached_allergens(db: Session) -> list[models.Allergen]:
+    """
+    Returns all allergens, hitting the database only when the cached copy is
+    stale. Cached rows are detached copies so they outlive the loading session.
+    """
+    with _allergen_lock:
+        fresh = (
+            _allergen_cache["data"] is not None
+            and _allergen_cache["loaded_version"] == _allergen_cache["version"]
+            and time.monotonic() - _allergen_cache["loaded_at"] < ALLERGEN_CACHE_TTL
+        )
+        if fresh:
+            return _allergen_cache["data"]
+        version = _allergen_cache["version"]
+
+    allergens = [
+        models.Allergen(id=a.id, name=a.name, keywords=list(a.keywords or []))
+        for a in crud.get_allergens(db)
+    ]
+
+    with _allergen_lock:
+        # Only publish if nothing was invalidated while we were loading
+        if _allergen_cache["version"] == version:
+            _allergen_cache["data"] = allergens
+            _allergen_cache["loaded_version"] = version
+            _allergen_cache["loaded_at"] = time.monotonic()
+    return allergens
+
+# Bumped on every recipe or ingredient row write in this process. The database
+# aggregates in the list ETag cover writes made by other processes.
+_recipe_version = 0
+_recipe_version_lock = threading.Lock()
+
+def get_recipe_version() -> int:
+    with _recipe_version_lock:
+        return _recipe_version
+
+def bump_recipe_version():
+    """For bulk UPDATE/DELETE statements, which skip the ORM events below."""
+    global _recipe_version
+    with _recipe_version_lock:
+        _recipe_version += 1
+
+@event.listens_for(models.Recipe, "after_insert")
+@event.listens_for(models.Recipe, "after_update")
+@event.listens_for(models.Recipe, "after_delete")
+@event.listens_for(models.Ingredient, "after_insert")
+@event.listens_for(models.Ingredient, "after_update")
+@event.listens_for(models.Ingredient, "after_delete")
+def _bump_recipe_version(mapper, connection, target):
+    bump_recipe_version()
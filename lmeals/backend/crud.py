@@ -1,5 +1,9 @@
-from sqlalchemy.orm import Session, joinedload
-import models, schemas, assets
+import json
+from datetime import date, datetime
+from sqlalchemy import JSON, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, defer, joinedload, raiseload, selectinload
+import models, schemas, assets, cache
 
 # Recipe CRUD operations
 def get_recipe(db: Session, recipe_id: int):
@@ -8,11 +12,21 @@ def get_recipe(db: Session, recipe_id: int):
 def get_recipe_by_source_url(db: Session, source_url: str):
     return db.query(models.Recipe).filter(models.Recipe.source_url == source_url).first()
 
+# List views only need the card fields: skip the ingredients (the allergen
+# check loads texts for its candidates only) and the large JSON/text columns.
+# raiseload turns an accidental per-row access into an error, not N queries.
+_RECIPE_LIST_OPTIONS = (
+    raiseload(models.Recipe.ingredients),
+    defer(models.Recipe.instructions),
+    defer(models.Recipe.instruction_template),
+    defer(models.Recipe.notes),
+)
+
 def get_recipes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Recipe).offset(skip).limit(limit).all()
+    return db.query(models.Recipe).options(*_RECIPE_LIST_OPTIONS).offset(skip).limit(limit).all()
 
-def create_recipe(db: Session, recipe: schemas.RecipeCreate):
-    db_recipe = models.Recipe(
+def _new_recipe(recipe: schemas.RecipeCreate) -> models.Recipe:
+    return models.Recipe(
         title=recipe.title,
         instructions=recipe.instructions,
         prep_time=recipe.prep_time,
@@ -22,17 +36,32 @@ def create_recipe(db: Session, recipe: schemas.RecipeCreate):
         instruction_template=recipe.instruction_template,
         image_url=str(recipe.image_url) if recipe.image_url else None,
         source_url=str(recipe.source_url),
-        notes=recipe.notes
+        notes=recipe.notes,
+        ingredients=[models.Ingredient(**i.model_dump()) for i in recipe.ingredients],
     )
+
+# Committed recipes are re-read with a query rather than db.refresh(): a
+# refresh loads each recipe's ingredients with a separate lazy load.
+def _reload_recipes(db: Session, recipe_ids: list[int]) -> list[models.Recipe]:
+    by_id = {r.id: r for r in db.query(models.Recipe).filter(models.Recipe.id.in_(recipe_ids))}
+    return [by_id[recipe_id] for recipe_id in recipe_ids]
+
+def create_recipe(db: Session, recipe: schemas.RecipeCreate):
+    db_recipe = _new_recipe(recipe)
     db.add(db_recipe)
+    db.flush()
+    recipe_id = db_recipe.id
     db.commit()
-    db.refresh(db_recipe)
-    for ingredient_data in recipe.ingredients:
-        db_ingredient = models.Ingredient(**ingredient_data.model_dump(), recipe_id=db_recipe.id)
-        db.add(db_ingredient)
+    return get_recipe(db, recipe_id)
+
+def create_recipes(db: Session, recipes: list[schemas.RecipeCreate]) -> list[models.Recipe]:
+    """Inserts several recipes with their ingredients in a single transaction."""
+    db_recipes = [_new_recipe(recipe) for recipe in recipes]
+    db.add_all(db_recipes)
+    db.flush()
+    recipe_ids = [db_recipe.id for db_recipe in db_recipes]
     db.commit()
-    db.refresh(db_recipe)
-    return db_recipe
+    return _reload_recipes(db, recipe_ids)
 
 def update_recipe(db: Session, recipe_id: int, recipe: schemas.RecipeCreate):
     db_recipe = get_recipe(db, recipe_id)
@@ -40,7 +69,7 @@ def update_recipe(db: Session, recipe_id: int, recipe: schemas.RecipeCreate):
         for key, value in recipe.model_dump().items():
             setattr(db_recipe, key, value)
         db.commit()
-        db.refresh(db_recipe)
+        db_recipe = get_recipe(db, recipe_id)
     return db_recipe
 
 def delete_recipe(db: Session, recipe_id: int):
@@ -53,17 +82,145 @@ def delete_recipe(db: Session, recipe_id: int):
         db.commit()
     return db_recipe
 
+def get_recipes_fingerprint(db: Session):
+    """
+    Cheap aggregate that changes whenever a recipe is added, removed or updated.
+    """
+    return db.query(
+        func.count(models.Recipe.id),
+        func.max(models.Recipe.id),
+        func.max(models.Recipe.updated_at),
+        func.count(models.Recipe.id).filter(models.Recipe.is_favorite == True),
+    ).one()
+
+def get_recipe_fingerprint(db: Session, recipe_id: int):
+    """
+    Per-recipe aggregate that changes when the recipe row or its ingredient rows
+    are rewritten, whichever process wrote them. None if the recipe is missing.
+    """
+    row = (
+        db.query(
+            models.Recipe.created_at,
+            models.Recipe.updated_at,
+            func.count(models.Ingredient.id),
+            func.max(models.Ingredient.id),
+        )
+        .outerjoin(models.Recipe.ingredients)
+        .filter(models.Recipe.id == recipe_id)
+        .group_by(models.Recipe.id)
+        .first()
+    )
+    return tuple(row) if row else None
+
 def get_favorite_recipes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Recipe).filter(models.Recipe.is_favorite == True).offset(skip).limit(limit).all()
+    return db.query(models.Recipe).filter(models.Recipe.is_favorite == True).options(*_RECIPE_LIST_OPTIONS).offset(skip).limit(limit).all()
+
+def search_recipe_ids(db: Session, term: str) -> list[int]:
+    """
+    Ids of recipes whose title or any ingredient contains `term`. SQLite's LIKE
+    ignores case for ASCII letters only, which covers the search box's needs.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    ingredient_hits = select(models.Ingredient.recipe_id).where(models.Ingredient.text.like(pattern, escape="\\"))
+    rows = db.execute(
+        select(models.Recipe.id)
+        .where(or_(models.Recipe.title.like(pattern, escape="\\"), models.Recipe.id.in_(ingredient_hits)))
+        .order_by(models.Recipe.id)
+    )
+    return list(rows.scalars())
+
+def get_ingredient_texts(db: Session, recipe_ids) -> dict[int, list[str]]:
+    """Ingredient texts grouped by recipe, for recipes loaded without their ingredients."""
+    texts = {}
+    if not recipe_ids:
+        return texts
+    rows = db.execute(
+        select(models.Ingredient.recipe_id, models.Ingredient.text)
+        .where(models.Ingredient.recipe_id.in_(recipe_ids))
+        .order_by(models.Ingredient.id)
+    )
+    for recipe_id, text in rows:
+        texts.setdefault(recipe_id, []).append(text)
+    return texts
+
+def _template_missing():
+    # JSON columns may hold a JSON 'null' instead of SQL NULL
+    return or_(
+        models.Recipe.instruction_template.is_(None),
+        models.Recipe.instruction_template == JSON.NULL,
+    )
+
+def get_instructions_needing_template(db: Session, recipe_id: int) -> list[str] | None:
+    """
+    Reads only the instructions column of a recipe that has no template yet,
+    without loading the recipe or its ingredients. None if there is nothing to do.
+    """
+    return db.execute(
+        select(models.Recipe.instructions)
+        .where(models.Recipe.id == recipe_id, _template_missing())
+    ).scalar_one_or_none()
+
+def set_instruction_template(db: Session, recipe_id: int, template: list[str]) -> bool:
+    """
+    Stores a generated template in one conditional UPDATE, only if the recipe
+    still has instructions and no template. Returns whether a row was written.
+    """
+    result = db.execute(
+        update(models.Recipe)
+        .where(models.Recipe.id == recipe_id, _template_missing(), models.Recipe.instructions.is_not(None))
+        .values(instruction_template=template)
+    )
+    db.commit()
+    # A Core UPDATE fires no ORM events, so cached recipe bodies are invalidated here
+    cache.bump_recipe_version()
+    return result.rowcount > 0
 
 def set_favorite_status(db: Session, recipe_id: int, is_favorite: bool):
     db_recipe = get_recipe(db, recipe_id)
     if db_recipe:
         db_recipe.is_favorite = is_favorite
         db.commit()
-        db.refresh(db_recipe)
+        db_recipe = get_recipe(db, recipe_id)
     return db_recipe
 
+def get_allergen_candidate_recipe_ids(db: Session, recipe_ids: list[int], keywords: list[str]) -> set[int]:
+    """
+    Returns ids of recipes with at least one ingredient that may match an allergen
+    keyword, in a single query. An ingredient qualifies if its lowercased text
+    contains the first word of a keyword, or if it has any non-ASCII character
+    (such text is translated before matching, so it cannot be ruled out here).
+
+    A false negative here hides an allergen, so this relies on two facts:
+    SQLite's lower() only folds ASCII, which is why any non-ASCII text passes
+    through the GLOB; and translator.translate_to_english never translates
+    pure-ASCII text, so its variants are all derived from the lowered original.
+    """
+    if not recipe_ids or not keywords:
+        return set()
+
+    tokens = sorted({kw.lower().split()[0] for kw in keywords if kw and kw.strip()})
+    # The tokens go in as one JSON parameter: an OR term per token would nest
+    # past SQLite's expression depth limit (1000) once keywords are expanded
+    token_rows = func.json_each(json.dumps(tokens)).table_valued("value")
+    token_match = (
+        select(1)
+        .select_from(token_rows)
+        .where(func.instr(func.lower(models.Ingredient.text), token_rows.c.value) > 0)
+        .exists()
+    )
+
+    rows = (
+        db.query(models.Ingredient.recipe_id)
+        .filter(
+            models.Ingredient.recipe_id.in_(recipe_ids),
+            or_(token_match, models.Ingredient.text.op("GLOB")("*[^ -~]*")),
+        )
+        .distinct()
+        .all()
+    )
+    return {row[0] for row in rows}
+
 # Allergen CRUD operations
 def get_allergen(db: Session, allergen_id: int):
     return db.query(models.Allergen).filter(models.Allergen.id == allergen_id).first()
@@ -75,10 +232,24 @@ def get_allergens(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.Allergen).offset(skip).limit(limit).all()
 
 def create_allergen(db: Session, allergen: schemas.AllergenCreate, keywords: list[str] = []):
-    db_allergen = models.Allergen(name=allergen.name, keywords=keywords)
-    db.add(db_allergen)
+    """
+    Atomically inserts the allergen; returns None if the name already exists.
+    """
+    stmt = (
+        sqlite_insert(models.Allergen)
+        .values(name=allergen.name, keywords=keywords)
+        .on_conflict_do_nothing(index_elements=["name"])
+        .returning(models.Allergen)
+    )
+    db_allergen = db.scalars(stmt).first()
     db.commit()
-    db.refresh(db_allergen)
+    return db_allergen
+
+def update_allergen_keywords(db: Session, allergen_id: int, keywords: list[str]):
+    db_allergen = get_allergen(db, allergen_id)
+    if db_allergen:
+        db_allergen.keywords = keywords
+        db.commit()
     return db_allergen
 
 def delete_allergen(db: Session, allergen_id: int):
@@ -89,8 +260,8 @@ def delete_allergen(db: Session, allergen_id: int):
     return db_allergen
 
 # Meal Plan CRUD operations
-def get_meal_plan_entries(db: Session, start_date: str, end_date: str):
-    return db.query(models.MealPlanEntry).filter(models.MealPlanEntry.date.between(start_date, end_date)).options(joinedload(models.MealPlanEntry.recipe).joinedload(models.Recipe.ingredients)).all()
+def get_meal_plan_entries(db: Session, start_date: date, end_date: date):
+    return db.query(models.MealPlanEntry).filter(models.MealPlanEntry.date.between(start_date, end_date)).options(selectinload(models.MealPlanEntry.recipe).selectinload(models.Recipe.ingredients)).all()
 
 def create_meal_plan_entry(db: Session, entry: schemas.MealPlanEntryCreate):
     # Verify recipe exists to avoid IntegrityError
@@ -105,9 +276,36 @@ def create_meal_plan_entry(db: Session, entry: schemas.MealPlanEntryCreate):
 
     db_entry = models.MealPlanEntry(**entry.model_dump())
     db.add(db_entry)
+    db.flush()
+    entry_id = db_entry.id
     db.commit()
-    db.refresh(db_entry)
-    return db_entry
+    return db.query(models.MealPlanEntry).filter(models.MealPlanEntry.id == entry_id).options(selectinload(models.MealPlanEntry.recipe).selectinload(models.Recipe.ingredients)).one()
+
+MEAL_PLAN_BULK_BATCH_SIZE = 1000
+
+def create_meal_plan_entries(db: Session, entries: list[schemas.MealPlanEntryCreate], batch_size: int = MEAL_PLAN_BULK_BATCH_SIZE):
+    """
+    Inserts many meal plan entries in one transaction using multi-row INSERTs.
+    Returns None if any entry references a missing recipe.
+    """
+    if not entries:
+        return []
+
+    recipe_ids = {e.recipe_id for e in entries}
+    found = set(db.scalars(select(models.Recipe.id).where(models.Recipe.id.in_(recipe_ids))))
+    if found != recipe_ids:
+        return None
+
+    rows = [e.model_dump() for e in entries]
+    new_ids = []
+    for start in range(0, len(rows), batch_size):
+        new_ids.extend(db.scalars(
+            insert(models.MealPlanEntry).returning(models.MealPlanEntry.id),
+            rows[start:start + batch_size],
+        ))
+    db.commit()
+
+    return db.query(models.MealPlanEntry).filter(models.MealPlanEntry.id.in_(new_ids)).options(selectinload(models.MealPlanEntry.recipe).selectinload(models.Recipe.ingredients)).order_by(models.MealPlanEntry.id).all()
 
 def delete_meal_plan_entry(db: Session, entry_id: int):
     db_entry = db.query(models.MealPlanEntry).filter(models.MealPlanEntry.id == entry_id).first()
@@ -117,6 +315,23 @@ def delete_meal_plan_entry(db: Session, entry_id: int):
     return db_entry
 
 # Setting CRUD operations
+def get_llm_cache_entry(db: Session, input_hash: str, now: datetime):
+    return db.query(models.LLMCacheEntry).filter(
+        models.LLMCacheEntry.input_hash == input_hash,
+        models.LLMCacheEntry.expires_at > now,
+    ).first()
+
+def save_llm_cache_entry(db: Session, input_hash: str, prompt_version: str, model_id: str, response, created_at: datetime, expires_at: datetime):
+    """Upserts a cached LLM response and drops expired entries in the same commit."""
+    values = dict(prompt_version=prompt_version, model_id=model_id, response=response, created_at=created_at, expires_at=expires_at)
+    db.execute(
+        sqlite_insert(models.LLMCacheEntry)
+        .values(input_hash=input_hash, **values)
+        .on_conflict_do_update(index_elements=[models.LLMCacheEntry.input_hash], set_=values)
+    )
+    db.execute(delete(models.LLMCacheEntry).where(models.LLMCacheEntry.expires_at <= created_at))
+    db.commit()
+
 def get_setting(db: Session, key: str):
     return db.query(models.Setting).filter(models.Setting.key == key).first()
 
@@ -0,0 +1,15 @@
+"""
+FastAPI dependencies shared by all routers.
+"""
+from database import SessionLocal
+
+# A plain session per request rather than a scoped_session: FastAPI may run a
+# sync dependency's setup and teardown on different threadpool threads, so a
+# thread-local registry's remove() could clear the wrong thread's session.
+def get_db():
+    """Yields a database session for the duration of one request."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
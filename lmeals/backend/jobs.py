@@ -0,0 +1,50 @@
+"""
+Dedicated worker pool for slow background work (LLM calls, ffmpeg, downloads).
+
+Starlette runs sync BackgroundTasks on the same AnyIO threadpool that serves
+sync endpoints, so a burst of scrapes could starve request handling. Routers
+schedule `jobs.submit` as the background task instead: it returns at once
+after the response is sent and the actual work runs here.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger("lmeals.jobs")
+
+JOB_WORKERS = int(os.environ.get("LMEALS_JOB_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="lmeals-job")
+_timers: set[threading.Timer] = set()
+_timers_lock = threading.Lock()
+
+def _run(fn, args, kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except Exception:
+        logger.exception("Background job %s failed", getattr(fn, "__name__", fn))
+
+def submit(fn, *args, **kwargs) -> Future:
+    return _executor.submit(_run, fn, args, kwargs)
+
+def submit_later(delay: float, fn, *args, **kwargs) -> None:
+    """Queues fn on the pool after `delay` seconds; no worker is held while waiting."""
+    def fire():
+        with _timers_lock:
+            _timers.discard(timer)
+        submit(fn, *args, **kwargs)
+
+    timer = threading.Timer(delay, fire)
+    timer.daemon = True
+    with _timers_lock:
+        _timers.add(timer)
+    timer.start()
+
+def shutdown():
+    """Drops queued and delayed jobs and lets running ones finish in the background."""
+    with _timers_lock:
+        for timer in _timers:
+            timer.cancel()
+        _timers.clear()
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,47 @@
+"""
+Development aid that reports ORM lazy loads triggered while serving a request.
+
+Lazy loads inside a request are where N+1 query regressions come from
+(e.g. `recipe.ingredients` or `MealPlanEntry.recipe` accessed in a loop
+without an eager loader option). Enable with LMEALS_LAZY_LOADS=warn to log
+them or LMEALS_LAZY_LOADS=raise to fail the request.
+"""
+import logging
+from contextvars import ContextVar
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger("lmeals.lazy_load_guard")
+
+_current_request: ContextVar[str | None] = ContextVar("lazy_load_guard_request", default=None)
+
+class LazyLoadError(RuntimeError):
+    pass
+
+def install(app: FastAPI, mode: str = "warn"):
+    """Hooks the session events and the request middleware into `app`."""
+    raise_on_lazy_load = mode == "raise"
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _check_lazy_load(orm_execute_state: ORMExecuteState):
+        request_path = _current_request.get()
+        if request_path is None or not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+            return
+        path = orm_execute_state.loader_strategy_path
+        attribute = path[-1] if path else orm_execute_state.lazy_loaded_from.mapper.class_.__name__
+        message = f"Lazy load of {attribute} during {request_path}"
+        if raise_on_lazy_load:
+            raise LazyLoadError(message)
+        logger.warning(message)
+
+    @app.middleware("http")
+    async def track_request(request: Request, call_next):
+        token = _current_request.set(f"{request.method} {request.url.path}")
+        try:
+            return await call_next(request)
+        finally:
+            _current_request.reset(token)
+
+    logger.debug("Lazy-load guard enabled (mode=%s)", mode)
@@ -1,13 +1,75 @@
 from groq import Groq
-import json
+import httpx
+import logging
+import orjson
 import os
+import re
+import threading
 
 import time
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup
 
-from database import SessionLocal
-import crud
+import cache
+import llm_cache
 
-def _call_groq_with_retry(client, messages, model, max_retries=3, response_format=None):
+logger = logging.getLogger("lmeals.llm")
+
+# One Groq client (and its keep-alive connection pool) shared by every caller
+_GROQ_CLIENT: Groq | None = None
+_GROQ_API_KEY: str | None = None
+_GROQ_CLIENT_LOCK = threading.Lock()
+
+def _get_or_build_client(api_key: str) -> Groq:
+    """
+    Returns the shared Groq client, rebuilding it only when the API key changes.
+    """
+    global _GROQ_CLIENT, _GROQ_API_KEY
+    with _GROQ_CLIENT_LOCK:
+        if _GROQ_CLIENT is None or _GROQ_API_KEY != api_key:
+            _GROQ_CLIENT = Groq(
+                api_key=api_key,
+                http_client=httpx.Client(
+                    limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+                ),
+            )
+            _GROQ_API_KEY = api_key
+        return _GROQ_CLIENT
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; acquire() blocks until a request may be sent.
+    Pacing calls up front is cheaper than tripping Groq's limit and retrying.
+    """
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Shared by every endpoint and background task in this process
+_chat_rate_limit = TokenBucket(float(os.environ.get("GROQ_CHAT_RPM", "30")), burst=5)
+_audio_rate_limit = TokenBucket(float(os.environ.get("GROQ_AUDIO_RPM", "20")), burst=5)
+
+def _is_transient_groq_error(e: Exception) -> bool:
+    """503 (Over Capacity) and rate limit errors are worth retrying; nothing else is."""
+    error_str = str(e).lower()
+    return "503" in error_str or "rate limit" in error_str or "over capacity" in error_str
+
+def _call_groq_with_retry(client, messages, model, max_retries=3, response_format=None, stream=False):
     """
     Helper function to call Groq API with exponential backoff for 503/Rate Limit errors.
     """
@@ -20,53 +82,106 @@ def _call_groq_with_retry(client, messages, model, max_retries=3, response_forma
             }
             if response_format:
                 kwargs["response_format"] = response_format
+            if stream:
+                kwargs["stream"] = True
                 
+            _chat_rate_limit.acquire()
             return client.chat.completions.create(**kwargs)
         except Exception as e:
             last_exception = e
-            error_str = str(e)
-            # Check for 503 (Over Capacity) or Rate Limit errors
-            if "503" in error_str or "rate limit" in error_str.lower() or "over capacity" in error_str.lower():
+            if _is_transient_groq_error(e):
                 wait_time = 2 ** attempt  # 1, 2, 4 seconds...
-                print(f"Groq API Error: {error_str}. Retrying in {wait_time}s...")
+                logger.warning("Groq API error: %s. Retrying in %ss", e, wait_time)
                 time.sleep(wait_time)
             else:
                 raise e # Don't retry other errors
     
-    print(f"Max retries ({max_retries}) exceeded for Groq API call.")
+    logger.error("Max retries (%d) exceeded for Groq API call", max_retries)
     raise last_exception
 
-def extract_with_groq(html: str):
+# Cleared the first time Groq rejects stream=True with JSON mode, so later
+# calls go straight to a blocking request instead of paying for the rejection
+_json_streaming_supported = True
+
+def _stream_json_completion(client, messages, model):
     """
-    Uses the Groq API to extract recipe data from HTML using credentials from environment variables or database settings.
-    Returns a dictionary of recipe data or None if extraction fails.
+    Streams a JSON-mode completion and parses it as soon as the top-level
+    JSON value is closed, instead of waiting for the stream to finish.
+    Falls back to a regular (non-streaming) call if streaming is rejected,
+    and stops trying to stream for the rest of the process.
     """
-    api_key = os.environ.get("GROQ_API_KEY")
-    model = os.environ.get("GROQ_MODEL")
-
-    if not api_key or not model:
-        db = SessionLocal()
+    global _json_streaming_supported
+    stream = None
+    if _json_streaming_supported:
         try:
-            if not api_key:
-                setting = crud.get_setting(db, "GROQ_API_KEY")
-                if setting:
-                    api_key = setting.value
-            if not model:
-                setting = crud.get_setting(db, "GROQ_MODEL")
-                if setting:
-                    model = setting.value
-                else:
-                    model = "llama3-70b-8192" # Default if not in env or DB
-        finally:
-            db.close()
-
-    if not api_key:
-        print("GROQ_API_KEY environment variable is not set and not found in settings.")
-        return None
-
-    client = Groq(api_key=api_key)
+            stream = _call_groq_with_retry(
+                client=client,
+                messages=messages,
+                model=model,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+        except Exception as e:
+            # Transient errors already went through the retry ladder; running
+            # it again for the blocking call would only double the wait
+            if _is_transient_groq_error(e):
+                raise
+            _json_streaming_supported = False
+            logger.warning("Groq rejected streaming in JSON mode (%s); using blocking calls from now on", e)
+
+    if stream is None:
+        completion = _call_groq_with_retry(
+            client=client,
+            messages=messages,
+            model=model,
+            response_format={"type": "json_object"}
+        )
+        return orjson.loads(completion.choices[0].message.content)
 
-    system_prompt = """
+    buffer = bytearray()
+    depth = 0
+    in_string = False
+    escaped = False
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            buffer += delta.encode("utf-8")
+
+            # Track brace depth outside of string literals
+            closed = False
+            for ch in delta:
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch in "{[":
+                    depth += 1
+                elif ch in "}]":
+                    depth -= 1
+                    if depth == 0:
+                        closed = True
+
+            if closed:
+                try:
+                    return orjson.loads(buffer)
+                except orjson.JSONDecodeError:
+                    # Trailing content in this chunk; keep reading until the stream ends
+                    pass
+    finally:
+        stream.close()
+
+    return orjson.loads(buffer)
+
+RECIPE_EXTRACTION_PROMPT = """
     You are an expert recipe data extractor. Your task is to extract recipe data from the provided text.
     
     CRITICAL: If the content contains MULTIPLE distinct recipes (e.g., "5 Easy Pasta Dishes" or a list of items), you MUST return a JSON ARRAY of recipe objects.
@@ -121,9 +236,11 @@ def extract_with_groq(html: str):
     - Escape internal quotes properly.
     """
 
-    # Extract only text from HTML to reduce tokens and improve accuracy
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
+def _html_to_text(html: str) -> str:
+    """
+    Reduces HTML to the visible text (plus image placeholders) sent to Groq.
+    """
+    soup = BeautifulSoup(html, 'lxml')
     
     # Remove script and style elements
     for script in soup(["script", "style"]):
@@ -145,50 +262,91 @@ def extract_with_groq(html: str):
     chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
     # Drop blank lines
     text = '\n'.join(chunk for chunk in chunks if chunk)
+    return text
+
+def _normalize_recipe_list(recipe_data):
+    """
+    Wraps a single recipe object in a list and validates the required keys.
+    Returns None if the response does not look like recipe data.
+    """
+    # Ensure we always return an array
+    if isinstance(recipe_data, dict):
+        # Old format: single recipe object, wrap in array
+        recipe_data = [recipe_data]
+    elif not isinstance(recipe_data, list):
+        logger.error("AI returned unexpected format: %s", type(recipe_data))
+        return None
+
+    # Validate each recipe in the array
+    for recipe in recipe_data:
+        required_keys = ["title", "ingredients", "instructions"]
+        if not all(key in recipe for key in required_keys):
+            logger.warning("Groq response was missing one or more required keys")
+            return None
+        if not isinstance(recipe.get("ingredients"), list) or not isinstance(recipe.get("instructions"), list):
+            logger.warning("Groq response 'ingredients' or 'instructions' is not a list")
+            return None
+
+    return recipe_data
+
+def extract_with_groq(html: str):
+    """
+    Uses the Groq API to extract recipe data from HTML using credentials from environment variables or database settings.
+    Returns a dictionary of recipe data or None if extraction fails.
+    """
+    api_key = os.environ.get("GROQ_API_KEY") or cache.get_setting_value("GROQ_API_KEY")
+    # Default if not in env or DB
+    model = os.environ.get("GROQ_MODEL") or cache.get_setting_value("GROQ_MODEL") or "llama3-70b-8192"
+
+    if not api_key:
+        logger.warning("GROQ_API_KEY environment variable is not set and not found in settings")
+        return None
+
+    # Identical HTML with the same model and prompt never re-hits Groq
+    html_key = llm_cache.make_key("html", model, html)
+    cached = llm_cache.check_cache(html_key)
+    if cached is not None:
+        logger.debug("Using cached AI extraction result")
+        return cached
+    if llm_cache.recently_failed(html_key):
+        logger.debug("AI extraction failed recently for this page, not retrying yet")
+        return None
+
+    recipes = _extract_recipes_uncached(api_key, model, html)
+    if recipes:
+        llm_cache.save_to_cache(html_key, model, recipes)
+    else:
+        llm_cache.record_failure(html_key)
+    return recipes
+
+def _extract_recipes_uncached(api_key: str, model: str, html: str):
+    client = _get_or_build_client(api_key)
+
+    # Extract only text from HTML to reduce tokens and improve accuracy
+    text = _html_to_text(html)
 
     try:
-        chat_completion = _call_groq_with_retry(
+        recipe_data = _stream_json_completion(
             client=client,
             messages=[
                 {
                     "role": "system",
-                    "content": system_prompt,
+                    "content": RECIPE_EXTRACTION_PROMPT,
                 },
                 {
                     "role": "user",
                     "content": f"Here is the recipe text:\n\n{text}",
                 },
             ],
-            model=model,
-            response_format={"type": "json_object"}
+            model=model
         )
-        response_text = chat_completion.choices[0].message.content
-        recipe_data = json.loads(response_text)
 
-        # Ensure we always return an array
-        if isinstance(recipe_data, dict):
-            # Old format: single recipe object, wrap in array
-            recipe_data = [recipe_data]
-        elif not isinstance(recipe_data, list):
-            print(f"ERROR: AI returned unexpected format: {type(recipe_data)}")
-            return None
-            
-        # Validate each recipe in the array
-        for recipe in recipe_data:
-            required_keys = ["title", "ingredients", "instructions"]
-            if not all(key in recipe for key in required_keys):
-                print("Groq response was missing one or more required keys.")
-                return None
-            if not isinstance(recipe.get("ingredients"), list) or not isinstance(recipe.get("instructions"), list):
-                print("Groq response 'ingredients' or 'instructions' is not a list.")
-                return None
-
-        return recipe_data
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse JSON response from Groq: {e}")
+        return _normalize_recipe_list(recipe_data)
+    except orjson.JSONDecodeError:
+        logger.exception("Failed to parse JSON response from Groq")
         return None
-    except Exception as e:
-        print(f"An error occurred with the Groq API call: {e}")
+    except Exception:
+        logger.exception("An error occurred with the Groq API call")
         return None
 
 def extract_recipe_from_text(text: str, metadata: dict = None):
@@ -196,65 +354,10 @@ def extract_recipe_from_text(text: str, metadata: dict = None):
     Uses Groq to extract recipe data from ANY raw text (html text or transcript).
     Optionally accepts metadata (like video description) to improve context.
     """
-    client, model = get_groq_client()
+    client, model, _ = get_groq_client()
     if not client:
         return None
 
-    system_prompt = """
-    You are an expert recipe data extractor. Your task is to extract recipe data from the provided text.
-    
-    CRITICAL: If the content contains MULTIPLE distinct recipes (e.g., "5 Easy Pasta Dishes" or a list of items), you MUST return a JSON ARRAY of recipe objects.
-    
-    RULES FOR MULTIPLE RECIPES:
-    1. Do NOT merge them into one usage recipe.
-    2. Do NOT pick just one. Extract ALL of them.
-    3. If the content represents a "Compilation" or "Listicle", treat every item as a distinct recipe.
-    4. Even if there is only one recipe, return a JSON ARRAY with a single object.
-    
-    Each recipe object must have the following keys: 
-    - "title": (string)
-    - "ingredients": (list of strings - TAG **ALL** QUANTITIES. Wrap **EVERY SINGLE** numerical quantity in [[qty:VALUE]]. Example: "[[qty:4.25]] cups ([[qty:281]]g) all-purpose flour" or "[[qty:2]] large eggs".)
-    - "instructions": (list of strings - BE HIGHLY DETAILED. Tag numerical quantities for ingredients only. Do NOT tag times/temps.)
-    - "prep_time": (string)
-    - "cook_time": (string)
-    - "active_time": (string - SUM of prep time + non-passive cook time. e.g. "Prep 15m + Cook 10m" -> "25 mins")
-    - "total_time": (string - SUM of active time + passive wait/chill/bake time. e.g. "Active 25m + Bake 45m" -> "1 hr 10 mins")
-    - "servings": (string - just the numeric part OR range, e.g. "4" or "20-24")
-    - "yield_unit": (string - the unit of measurement, e.g. "servings", "cookies", "people", "bowls", "muffins"). Default to "servings" if unclear.
-    - "image_url": (string)
-
-    TIME LOGIC:
-    - **active_time**: This is the "Hands-on User Effort". EXCLUDE baking, roasting, simmering, boiling, chilling, marinating, or "letting sit".
-      * NOTE: If "Cook Time" is just baking/roasting, do NOT add it to active_time. Active time should mostly be Prep + Mixing/Sautéing.
-    - **total_time**: This is "Ready In". You MUST scan for "Chill", "Marinate", "Rest", "Refrigerate", "Freeze" or "Overnight".
-      * NOTE: If text says "Refrigerate 3-4 hours" or "Overnight", the total time MUST include this (e.g. "4 hours 25 mins"). Do NOT ignore long wait times.
-    - **CONSISTENCY CHECK**: If you picked a specific option for "servings" (e.g. "Medium Cookies"), **YOU MUST USE THE COOK TIME FOR THAT SPECIFIC OPTION**. Do not blindly grab the first bake time you see (which might be for "Small Cookies"). Match the time to the size.
-
-    CRITICAL INGREDIENT TAGGING RULES:
-    1. Wrap **EVERY** number that represents a quantity, volume, or weight in [[qty:VALUE]]. 
-    2. If an ingredient has BOTH volume and weight (e.g., "1 cup (100g)"), tag BOTH: "[[qty:1]] cup ([[qty:100]]g)".
-    3. Convert fractions to decimals inside tags (e.g., 1/2 -> [[qty:0.5]], 4 1/4 -> [[qty:4.25]]).
-    4. ALLOW RANGES: Format as [[qty:MIN-MAX]] (e.g., "[[qty:10-15]]g" or "[[qty:1-2]] cups").
-    5. Tag standalone numbers: "[[qty:2]] eggs", "[[qty:3.5]] oz chocolate", "[[qty:165]]g sugar".
-    6. Be as granular and step-by-step as possible in the instructions.
-
-    SERVINGS & YIELD LOGIC:
-    1. If multiple units are available (e.g. "Serves 4 people" and "Makes 20 cookies"), prioritize the unit that is **MOST RELEVANT TO THE RESIPE TITLE/CONTENT**. (e.g. If the recipe is "Chocolate Chip Cookies", choose "Cookies" and "20". If the recipe is "Spicy Noodles", choose "People" or "Servings" even if "cookies" is mentioned elsewhere).
-    2. **SEARCH THE ENTIRE TEXT**: Do not just take the first "Serves: X" you see at the top. If the top says "Serves 12 people" but the notes say "Makes 20-24 cookies", **CHECK RELEVANCE**:
-       - If "Cookies" is **MORE RELEVANT** to the recipe content than "people" (e.g. recipe is for cookies), **CHOOSE THE COOKIES COUNT**.
-       - If "People" is **MORE RELEVANT** (e.g. recipe is for stew), **KEEP THE PEOPLE COUNT**.
-    3. If multiple sizes/yields are provided for the SAME unit:
-       - If > 2 options (e.g. 24 small, 20 med, 15 large): Choose the **MEDIAN** option.
-       - If exactly 2 options (e.g. 24 small, 20 large): Choose the **AVERAGE** rounded to the nearest whole number (e.g. 22).
-    4. **PRESERVE RANGES**: If the chosen yield/option is a range (e.g. "15-18 cookies"), **RETURN THE FULL RANGE STRING "15-18"**. Do NOT simplify it to a single number like "15" or "16.5". Start with the range string if possible.
-
-    IMPORTANT JSON FORMATTING RULES:
-    - Use strict JSON format.
-    - All property names and string values MUST be enclosed in standard double quotes (").
-    - DO NOT use smart quotes / curly quotes (“ or ”) anywhere in the JSON keys or values.
-    - Escape internal quotes properly.
-    """
-
     user_content = f"Extract recipe from this text:\n\n{text}"
     
     # Append metadata context if available (e.g. video descriptions)
@@ -264,7 +367,26 @@ def extract_recipe_from_text(text: str, metadata: dict = None):
         if metadata.get("title"):
             user_content += f"\n\nVideo Title: {metadata['title']}"
 
+    # Re-imports of the same video produce the same transcript and metadata
+    text_key = llm_cache.make_key("text", model, user_content)
+    cached = llm_cache.check_cache(text_key)
+    if cached is not None:
+        logger.debug("Using cached AI extraction result for text")
+        return cached
+    if llm_cache.recently_failed(text_key):
+        logger.debug("AI extraction failed recently for this text, not retrying yet")
+        return None
+
+    recipes = _extract_recipes_from_text_uncached(client, model, RECIPE_EXTRACTION_PROMPT, user_content)
+    if recipes:
+        llm_cache.save_to_cache(text_key, model, recipes)
+    else:
+        llm_cache.record_failure(text_key)
+    return recipes
+
+def _extract_recipes_from_text_uncached(client, model: str, system_prompt: str, user_content: str):
     try:
+        _chat_rate_limit.acquire()
         chat_completion = client.chat.completions.create(
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -273,61 +395,81 @@ def extract_recipe_from_text(text: str, metadata: dict = None):
             model=model,
             response_format={"type": "json_object"},
         )
-        recipe_data = json.loads(chat_completion.choices[0].message.content)
+        recipe_data = orjson.loads(chat_completion.choices[0].message.content)
         
         # Ensure we always return an array
         if isinstance(recipe_data, dict):
             recipe_data = [recipe_data]
         elif not isinstance(recipe_data, list):
-            print(f"ERROR: AI returned unexpected format: {type(recipe_data)}")
+            logger.error("AI returned unexpected format: %s", type(recipe_data))
             return None
             
         return recipe_data
-    except Exception as e:
-        print(f"Error extracting recipe from text: {e}")
+    except Exception:
+        logger.exception("Error extracting recipe from text")
         return None
 
-def transcribe_audio(file_path: str) -> str:
+def transcribe_audio(audio: str | tuple[str, bytes]) -> str:
     """
-    Transcribes an audio file using Groq's Whisper v3 large.
+    Transcribes audio using Groq's Whisper v3 large. Accepts a file path or
+    an in-memory (filename, bytes) chunk from audio_processor.chunk_audio.
     """
-    client, _ = get_groq_client()
+    client, _, _ = get_groq_client()
     if not client:
         return ""
 
+    name = audio[0] if isinstance(audio, tuple) else audio
     try:
-        with open(file_path, "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=(os.path.basename(file_path), file.read()),
-                model="whisper-large-v3",
-                response_format="json",
-            )
-            return transcription.text
-    except Exception as e:
-        print(f"Error transcribing audio {file_path}: {e}")
+        if isinstance(audio, tuple):
+            upload = audio
+        else:
+            with open(audio, "rb") as file:
+                upload = (os.path.basename(audio), file.read())
+        _audio_rate_limit.acquire()
+        transcription = client.audio.transcriptions.create(
+            file=upload,
+            model="whisper-large-v3",
+            response_format="json",
+        )
+        return transcription.text
+    except Exception:
+        logger.exception("Error transcribing audio %s", name)
         return ""
 
+WHISPER_CONCURRENCY = int(os.environ.get("WHISPER_CONCURRENCY", "5"))
+
+def transcribe_audio_chunks(chunks: list[str | tuple[str, bytes]], max_workers: int | None = None) -> list[str]:
+    """
+    Transcribes audio chunks concurrently (bounded to keep within Groq rate limits).
+    Results keep the input order; failed chunks come back as empty strings.
+    """
+    max_workers = max_workers or WHISPER_CONCURRENCY
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [transcribe_audio(chunk) for chunk in chunks]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(transcribe_audio, chunks))
+
 def get_groq_client():
+    """
+    Returns (client, primary_model, fast_model).
+    The fast model is used for short classification-style prompts.
+    """
     api_key = os.environ.get("GROQ_API_KEY")
     model = os.environ.get("GROQ_MODEL", "llama3-70b-8192")
+    fast_model = os.environ.get("GROQ_MODEL_FAST")
 
+    # Settings come from the in-memory cache; the DB is only read on a miss
     if not api_key:
-        db = SessionLocal()
-        try:
-            setting = crud.get_setting(db, "GROQ_API_KEY")
-            if setting:
-                api_key = setting.value
-            
-            model_setting = crud.get_setting(db, "GROQ_MODEL")
-            if model_setting:
-                model = model_setting.value
-        finally:
-            db.close()
+        api_key = cache.get_setting_value("GROQ_API_KEY")
+        model = cache.get_setting_value("GROQ_MODEL") or model
+    if not fast_model:
+        fast_model = cache.get_setting_value("GROQ_MODEL_FAST") or "llama-3.1-8b-instant"
 
     if not api_key:
-        return None, None
+        return None, None, None
     
-    return Groq(api_key=api_key), model
+    return _get_or_build_client(api_key), model, fast_model
 
 def expand_allergen_keywords(allergen_name: str) -> list[str]:
     """
@@ -347,15 +489,22 @@ def expand_allergen_keywords(allergen_name: str) -> list[str]:
         "fish": ["fish", "salmon", "tuna", "cod", "דג", "poisson", "pescado"],
         "shellfish": ["shrimp", "crab", "lobster", "prawn", "shellfish", "seafood", "רכיכות"],
     }
-    
-    client, model = get_groq_client()
+
+    # Well-known allergens are fully covered by the fallback table; skip the Groq round-trip
+    allergen_lower = allergen_name.lower()
+    for key, keywords in COMMON_ALLERGEN_KEYWORDS.items():
+        if allergen_lower == key or allergen_lower in keywords:
+            logger.info("Using built-in keywords for '%s': %s", allergen_name, keywords)
+            return keywords
+
+    client, _, model = get_groq_client()
     if not client:
-        print(f"Warning: No Groq client available for allergen '{allergen_name}'. Using fallback keywords.")
+        logger.warning("No Groq client available for allergen '%s', using fallback keywords", allergen_name)
         # Check if we have a fallback for this allergen
         allergen_lower = allergen_name.lower()
         for key, keywords in COMMON_ALLERGEN_KEYWORDS.items():
             if allergen_lower in keywords or key in allergen_lower:
-                print(f"Using fallback keywords for '{allergen_name}': {keywords}")
+                logger.info("Using fallback keywords for '%s': %s", allergen_name, keywords)
                 return keywords
         return [allergen_lower]
 
@@ -373,29 +522,26 @@ def expand_allergen_keywords(allergen_name: str) -> list[str]:
     """
 
     try:
-        print(f"Calling Groq API to expand keywords for allergen: '{allergen_name}'")
-        completion = client.chat.completions.create(
+        logger.info("Calling Groq API to expand keywords for allergen: '%s'", allergen_name)
+        data = _stream_json_completion(
+            client=client,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Allergen: {allergen_name}"}
             ],
-            model=model,
-            response_format={"type": "json_object"}
+            model=model
         )
+        logger.debug("Groq API response for '%s': %s", allergen_name, data)
         
-        response_content = completion.choices[0].message.content
-        print(f"Groq API response for '{allergen_name}': {response_content}")
-        
-        data = json.loads(response_content)
         keywords = data.get("keywords", [])
         
         if not keywords or len(keywords) <= 1:
-            print(f"Warning: Groq returned insufficient keywords for '{allergen_name}'. Response: {data}")
+            logger.warning("Groq returned insufficient keywords for '%s': %s", allergen_name, data)
             # Use fallback
             allergen_lower = allergen_name.lower()
             for key, fallback_keywords in COMMON_ALLERGEN_KEYWORDS.items():
                 if allergen_lower in fallback_keywords or key in allergen_lower:
-                    print(f"Using fallback keywords for '{allergen_name}': {fallback_keywords}")
+                    logger.info("Using fallback keywords for '%s': %s", allergen_name, fallback_keywords)
                     return fallback_keywords
         
         # Ensure the original name is included
@@ -403,21 +549,19 @@ def expand_allergen_keywords(allergen_name: str) -> list[str]:
             keywords.append(allergen_name.lower())
         
         result = list(set(keywords))  # Dedup
-        print(f"Final keywords for '{allergen_name}': {result}")
+        logger.debug("Final keywords for '%s': %s", allergen_name, result)
         return result
-    except Exception as e:
-        print(f"Error expanding allergen keywords for '{allergen_name}': {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error expanding allergen keywords for '%s'", allergen_name)
         
         # Use fallback on error
         allergen_lower = allergen_name.lower()
         for key, fallback_keywords in COMMON_ALLERGEN_KEYWORDS.items():
             if allergen_lower in fallback_keywords or key in allergen_lower:
-                print(f"Using fallback keywords after error for '{allergen_name}': {fallback_keywords}")
+                logger.info("Using fallback keywords after error for '%s': %s", allergen_name, fallback_keywords)
                 return fallback_keywords
         
-        print(f"No fallback found for '{allergen_name}', returning just the allergen name")
+        logger.info("No fallback found for '%s', returning just the allergen name", allergen_name)
         return [allergen_lower]
 
 
@@ -427,7 +571,7 @@ def generate_instruction_template(instructions: list[str]) -> list[str]:
     Identifies ingredient quantities and wraps them in [[qty:NUMBER]] while
     strictly ignoring temperatures, times, and tool sizes.
     """
-    client, model = get_groq_client()
+    client, model, _ = get_groq_client()
     if not client:
         return instructions
 
@@ -447,7 +591,8 @@ def generate_instruction_template(instructions: list[str]) -> list[str]:
     user_prompt = f"Recipe Instructions:\n" + "\n".join([f"{i+1}. {text}" for i, text in enumerate(instructions)])
 
     try:
-        print(f"Calling Groq to generate instruction template for {len(instructions)} steps.")
+        logger.info("Calling Groq to generate instruction template for %d steps", len(instructions))
+        _chat_rate_limit.acquire()
         completion = client.chat.completions.create(
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -457,21 +602,20 @@ def generate_instruction_template(instructions: list[str]) -> list[str]:
             response_format={"type": "json_object"}
         )
         
-        data = json.loads(completion.choices[0].message.content)
+        data = orjson.loads(completion.choices[0].message.content)
         templated = data.get("templated_instructions", [])
         
         if len(templated) == len(instructions):
             # Clean up potential list numbering if AI added it
             cleaned = []
             for t in templated:
-                import re
                 cleaned.append(re.sub(r'^\d+\.\s*', '', t))
             return cleaned
             
-        print(f"Warning: AI returned {len(templated)} steps but original had {len(instructions)}. Falling back.")
+        logger.warning("AI returned %d steps but original had %d, falling back", len(templated), len(instructions))
         return instructions
-    except Exception as e:
-        print(f"Error generating instruction template: {e}")
+    except Exception:
+        logger.exception("Error generating instruction template")
         return instructions
 
 
@@ -480,7 +624,7 @@ def verify_allergens_with_ai(ingredient_text: str, allergens: list[str]) -> bool
     Uses Groq to verify if an ingredient text actually contains any of the specified allergens.
     This helps prevent false positives like 'peanut butter' being flagged for a 'milk' allergy.
     """
-    client, model = get_groq_client()
+    client, _, model = get_groq_client()
     
     # Common sense local check for the most frequent false positives
     # This ensures things like 'Peanut Butter' don't trigger 'Milk' warnings even without an AI key.
@@ -500,7 +644,7 @@ def verify_allergens_with_ai(ingredient_text: str, allergens: list[str]) -> bool
                     # Example: "Peanut butter with milk" should still trigger for milk.
                     # We check if the name exists separately from the safe item.
                     if category not in safe_lowered.replace(safe_item, ""):
-                        print(f"Local Smart Verification: '{ingredient_text}' is safe for {category} (Known false positive: {safe_item})")
+                        logger.debug("Local verification: '%s' is safe for %s (known false positive: %s)", ingredient_text, category, safe_item)
                         return False
 
     if not client:
@@ -508,6 +652,11 @@ def verify_allergens_with_ai(ingredient_text: str, allergens: list[str]) -> bool
         # Still return True for anything else suspicious as a safety measure.
         return True 
 
+    verdict_key = (ingredient_text, tuple(sorted(allergens)))
+    cached = cache.allergen_verdicts.get(verdict_key)
+    if cached is not None:
+        return cached
+
     system_prompt = """
     You are a professional food safety and allergen expert. 
     Your task is to determine if a specific ingredient text contains any of the allergens listed by the user.
@@ -525,6 +674,7 @@ def verify_allergens_with_ai(ingredient_text: str, allergens: list[str]) -> bool
     """
 
     try:
+        _chat_rate_limit.acquire()
         completion = client.chat.completions.create(
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -534,12 +684,14 @@ def verify_allergens_with_ai(ingredient_text: str, allergens: list[str]) -> bool
             response_format={"type": "json_object"}
         )
         
-        data = json.loads(completion.choices[0].message.content)
+        data = orjson.loads(completion.choices[0].message.content)
         result = data.get("contains_allergen", True)
-        print(f"AI Verification for '{ingredient_text}': {result} ({data.get('reason')})")
+        logger.debug("AI verification for '%s': %s (%s)", ingredient_text, result, data.get('reason'))
+        # Errors fall through to the uncached True below and get retried next time
+        cache.allergen_verdicts.set(verdict_key, result)
         return result
-    except Exception as e:
-        print(f"Error in AI allergen verification: {e}")
+    except Exception:
+        logger.exception("Error in AI allergen verification")
         return True # Fallback to True on error
 
 
@@ -548,7 +700,7 @@ def identify_dish_timestamps(transcript: str, duration: int) -> list[int]:
     Uses Groq to identify 3-5 timestamps (in seconds) where the finished dish 
     is likely presented in the video based on the transcript.
     """
-    client, model = get_groq_client()
+    client, model, _ = get_groq_client()
     if not client:
         # Fallback: Just pick points in the last 20% of the video
         start = int(duration * 0.8)
@@ -577,7 +729,7 @@ def identify_dish_timestamps(transcript: str, duration: int) -> list[int]:
             response_format={"type": "json_object"}
         )
         
-        data = json.loads(completion.choices[0].message.content)
+        data = orjson.loads(completion.choices[0].message.content)
         timestamps = data.get("timestamps", [])
         
         # Validation
@@ -587,24 +739,31 @@ def identify_dish_timestamps(transcript: str, duration: int) -> list[int]:
             # Fallback
             start = int(duration * 0.8)
             fallback = [start + (i * (duration - start) // 4) for i in range(4)]
-            print(f"DEBUG: No valid timestamps found by AI, using fallback: {fallback}")
+            logger.debug("No valid timestamps found by AI, using fallback: %s", fallback)
             return fallback
             
-        print(f"DEBUG: AI identified timestamps: {valid_timestamps[:5]}")
+        logger.debug("AI identified timestamps: %s", valid_timestamps[:5])
         return valid_timestamps[:5]
-    except Exception as e:
-        print(f"Error identifying timestamps: {e}")
+    except Exception:
+        logger.exception("Error identifying timestamps")
         start = int(duration * 0.8)
         return [start + (i * (duration - start) // 4) for i in range(4)]
 
 
+# Anything that could be a link: a scheme, "www." or a bare domain with a path
+_LINK_HINT = re.compile(r'https?://|www\.|\b[\w-]+\.[a-z]{2,}/', re.IGNORECASE)
+
 def extract_recipe_link(description: str, video_title: str = "") -> str | None:
     """
     Uses AI to identify recipe URLs (web pages or PDFs) in a video description.
     Returns the most relevant recipe URL or None if not found.
     """
-    client, model = get_groq_client()
-    if not client or not description:
+    # Most descriptions carry no link at all; don't spend an LLM call on them
+    if not description or not _LINK_HINT.search(description):
+        return None
+
+    client, model, _ = get_groq_client()
+    if not client:
         return None
 
     system_prompt = """
@@ -635,15 +794,15 @@ def extract_recipe_link(description: str, video_title: str = "") -> str | None:
             response_format={"type": "json_object"}
         )
         
-        data = json.loads(completion.choices[0].message.content)
+        data = orjson.loads(completion.choices[0].message.content)
         url = data.get("recipe_url")
         
         if url and isinstance(url, str) and url.startswith("http"):
-            print(f"DEBUG: Found recipe link in description: {url}")
+            logger.debug("Found recipe link in description: %s", url)
             return url
             
-        print("DEBUG: No recipe link found in description")
+        logger.debug("No recipe link found in description")
         return None
-    except Exception as e:
-        print(f"Error extracting recipe link: {e}")
+    except Exception:
+        logger.exception("Error extracting recipe link")
         return None
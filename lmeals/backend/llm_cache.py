@@ -0,0 +1,64 @@
+"""
+Exact-match cache for AI recipe extractions (and other slow remote lookups,
+such as ingredient translations).
+
+The in-process TTLCache answers repeat scrapes instantly; the llm_cache table
+behind it keeps results for a week across restarts, since every miss is a
+billed Groq call.
+"""
+import copy
+import logging
+from datetime import datetime, timedelta, timezone
+
+import cache
+import crud
+from database import SessionLocal
+
+logger = logging.getLogger("lmeals.llm_cache")
+
+# Bump when the extraction prompts change so older answers aren't reused
+PROMPT_VERSION = "1"
+LLM_CACHE_TTL = timedelta(days=7)
+
+def make_key(kind: str, model: str, content: str) -> str:
+    return cache.content_key(kind, PROMPT_VERSION, model, content)
+
+def check_cache(key: str):
+    """Returns a copy of the cached extraction, or None on a miss."""
+    cached = cache.extraction_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    response = get_persisted(key)
+    if response is not None:
+        cache.extraction_cache.set(key, copy.deepcopy(response))
+    return response
+
+def save_to_cache(key: str, model: str, response):
+    cache.extraction_cache.set(key, copy.deepcopy(response))
+    persist(key, model, response)
+
+def get_persisted(key: str):
+    """Reads an unexpired entry from the llm_cache table only; None on a miss."""
+    try:
+        with SessionLocal() as db:
+            entry = crud.get_llm_cache_entry(db, key, datetime.now(timezone.utc))
+            return entry.response if entry else None
+    except Exception as e:
+        logger.warning("LLM cache lookup failed: %s", e)
+        return None
+
+def persist(key: str, model: str, response, ttl: timedelta = LLM_CACHE_TTL):
+    now = datetime.now(timezone.utc)
+    try:
+        with SessionLocal() as db:
+            crud.save_llm_cache_entry(db, key, PROMPT_VERSION, model, response, now, now + ttl)
+    except Exception as e:
+        logger.warning("Failed to persist LLM cache entry: %s", e)
+
+def recently_failed(key: str) -> bool:
+    return bool(cache.extraction_failures.get(key))
+
+def record_failure(key: str):
+    """Failures are only remembered briefly, in memory, to avoid retry storms."""
+    cache.extraction_failures.set(key, True)
@@ -0,0 +1,34 @@
+"""
+Queue-backed logging for the "lmeals" logger tree.
+
+Request handlers only enqueue records; a listener thread formats them and
+writes to stderr, so tracebacks from failed scrapes don't block the loop.
+"""
+import logging
+import logging.handlers
+import queue
+
+_listener: logging.handlers.QueueListener | None = None
+
+def start_logging(level: int | str = logging.INFO) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger("lmeals")
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream)
+    _listener.start()
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
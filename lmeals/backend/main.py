@@ -1,9 +1,39 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
+from contextlib import asynccontextmanager
+from anyio import to_thread
+import logging
+import os
+import re
+
+import assets
+import jobs
+import lazy_load_guard
+import logging_config
+import scraper
+from database import engine
+from routers import recipes, allergens, meal_plan, shopping_list, settings
+
+logging_config.start_logging(os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("lmeals.main")
 
-app = FastAPI()
+# Sync endpoints and threadpool offloads share AnyIO's limiter (40 by default);
+# slow scrape steps could otherwise queue up quick reads behind them
+SYNC_THREADPOOL_SIZE = int(os.getenv("LMEALS_THREADPOOL_SIZE", "80"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = SYNC_THREADPOOL_SIZE
+    jobs.submit(assets.prune_image_cache)
+    yield
+    await scraper.close_async_client()
+    scraper.shutdown_parse_pool()
+    jobs.shutdown()
+    logging_config.stop_logging()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,20 +43,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from fastapi import Request
+# Matches any run of two or more slashes (e.g. "//" or "///")
+_MULTISLASH = re.compile(r"/{2,}")
 
 @app.middleware("http")
 async def strip_double_slashes(request: Request, call_next):
-    if "//" in request.scope["path"]:
-        request.scope["path"] = request.scope["path"].replace("//", "/")
+    path = request.scope["path"]
+    if _MULTISLASH.search(path):
+        request.scope["path"] = _MULTISLASH.sub("/", path)
     response = await call_next(request)
     return response
 
-from routers import recipes, allergens, meal_plan, shopping_list
-
-from routers import settings
-import assets
-import os
+# Dev-only N+1 detector: LMEALS_LAZY_LOADS=warn logs lazy loads, =raise fails the request
+if os.getenv("LMEALS_LAZY_LOADS"):
+    lazy_load_guard.install(app, mode=os.getenv("LMEALS_LAZY_LOADS"))
 
 # Determine static directory (backend/static in dev, /app/static in container)
 static_dir = assets.STATIC_DIR if os.path.exists(assets.STATIC_DIR) else "/app/static"
@@ -37,33 +67,49 @@ app.include_router(meal_plan.router, prefix="/api", tags=["meal_plan"])
 app.include_router(shopping_list.router, prefix="/api", tags=["shopping_list"])
 app.include_router(settings.router, prefix="/api/settings", tags=["settings"])
 
+@app.get("/api/healthz")
+def healthz():
+    """Liveness check; also reports connection pool usage to spot pool exhaustion."""
+    return {"status": "ok", "db_pool": engine.pool.status()}
+
+def _image_response(request: Request, file_path: str):
+    """
+    FileResponse with the ETag/Last-Modified validators honoured, so browsers
+    revalidating an unchanged image get a 304 like they do from StaticFiles.
+    """
+    response = FileResponse(file_path, stat_result=os.stat(file_path))
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        not_modified = response.headers["etag"] in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    else:
+        not_modified = request.headers.get("if-modified-since") == response.headers["last-modified"]
+    if not_modified:
+        return Response(status_code=304, headers={k: response.headers[k] for k in ("etag", "last-modified")})
+    return response
+
 # Dedicated endpoint for candidate images (bypasses static mount issues)
 @app.get("/api/static/images/recipes/candidates/{filename}")
-async def serve_candidate_image(filename: str):
+async def serve_candidate_image(filename: str, request: Request):
     """Serve candidate images directly to bypass StaticFiles mount issues in containers"""
     candidates_dir = os.path.join(static_dir, "images", "recipes", "candidates")
     file_path = os.path.join(candidates_dir, filename)
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return _image_response(request, file_path)
     else:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"Candidate image not found: {filename}")
 
 @app.get("/api/static/images/recipes/{filename}")
-async def serve_recipe_image(filename: str):
+async def serve_recipe_image(filename: str, request: Request):
     """Serve recipe images directly to bypass StaticFiles mount issues in containers"""
     recipe_dir = os.path.join(static_dir, "images", "recipes")
     file_path = os.path.join(recipe_dir, filename)
     if os.path.exists(file_path):
-        return FileResponse(file_path)
+        return _image_response(request, file_path)
     else:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail=f"Recipe image not found: {filename}")
 
 app.mount("/api/static", StaticFiles(directory=static_dir), name="static")
-print(f"DEBUG: Mounted /api/static -> {static_dir}")
-
-import os
+logger.debug("Mounted /api/static -> %s", static_dir)
 
 # Serve frontend static files
 @app.get("/{full_path:path}")
@@ -0,0 +1,25 @@
+"""Add index on recipes (is_favorite, id) for the favorites page
+
+Revision ID: 2d8f6c3a9b51
+Revises: 5e2d9b7a4c18
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8f6c3a9b51'
+down_revision = '5e2d9b7a4c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Favorites pages become an index range scan in id order instead of a full table scan
+    op.create_index('ix_recipes_is_favorite_id', 'recipes', ['is_favorite', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_is_favorite_id', table_name='recipes')
@@ -0,0 +1,25 @@
+"""Add index on ingredients.recipe_id
+
+Revision ID: 3b7e1c9d5a20
+Revises: d284a123f456
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e1c9d5a20'
+down_revision = 'd284a123f456'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets the ingredient eager loader (recipe_id IN (...)) use index seeks
+    op.create_index('ix_ingredients_recipe_id', 'ingredients', ['recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ingredients_recipe_id', table_name='ingredients')
@@ -0,0 +1,25 @@
+"""Add covering index on meal_plan_entries (date, meal_type, recipe_id)
+
+Revision ID: 7c4f2a81e6b3
+Revises: 3b7e1c9d5a20
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4f2a81e6b3'
+down_revision = '3b7e1c9d5a20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the weekly date-range lookups without touching the table rows
+    op.create_index('ix_mpe_date_mealtype_recipe', 'meal_plan_entries', ['date', 'meal_type', 'recipe_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mpe_date_mealtype_recipe', table_name='meal_plan_entries')
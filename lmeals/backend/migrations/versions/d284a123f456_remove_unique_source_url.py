@@ -17,13 +17,11 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # SQLite requires batch mode for index/constraint changes
-    with op.batch_alter_table('recipes', schema=None) as batch_op:
-        batch_op.drop_index('ix_recipes_source_url')
-        batch_op.create_index('ix_recipes_source_url', ['source_url'], unique=False)
+    # Plain index DDL works on SQLite; batch mode would copy the whole table
+    op.drop_index('ix_recipes_source_url', table_name='recipes')
+    op.create_index('ix_recipes_source_url', 'recipes', ['source_url'], unique=False)
 
 
 def downgrade() -> None:
-    with op.batch_alter_table('recipes', schema=None) as batch_op:
-        batch_op.drop_index('ix_recipes_source_url')
-        batch_op.create_index('ix_recipes_source_url', ['source_url'], unique=True)
+    op.drop_index('ix_recipes_source_url', table_name='recipes')
+    op.create_index('ix_recipes_source_url', 'recipes', ['source_url'], unique=True)
@@ -17,18 +17,17 @@ depends_on = None
 
 
 def upgrade() -> None:
+    # Some databases already have these columns (created by create_all or a
+    # partial earlier run), so inspect first and only add what is missing.
+    inspector = sa.inspect(op.get_bind())
+
     # Add meal_type to meal_plan_entries
-    with op.batch_alter_table('meal_plan_entries', schema=None) as batch_op:
-        # Check if column exists is hard in generic alembic without inspection,
-        # but since we assume fresh install or broken state, we'll try to add it.
-        # SQLite doesn't support 'ADD COLUMN IF NOT EXISTS' easily via Alembic 
-        # without inspection.
-        # However, typically 'add_column' is fine.
-        batch_op.add_column(sa.Column('meal_type', sa.String(), nullable=True, server_default='Dinner'))
+    if 'meal_type' not in {c['name'] for c in inspector.get_columns('meal_plan_entries')}:
+        op.add_column('meal_plan_entries', sa.Column('meal_type', sa.String(), nullable=True, server_default='Dinner'))
 
     # Add keywords to allergens
-    with op.batch_alter_table('allergens', schema=None) as batch_op:
-        batch_op.add_column(sa.Column('keywords', sa.JSON(), nullable=True))
+    if 'keywords' not in {c['name'] for c in inspector.get_columns('allergens')}:
+        op.add_column('allergens', sa.Column('keywords', sa.JSON(), nullable=True))
 
 
 def downgrade() -> None:
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Date, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, Date, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -23,14 +23,20 @@ class Recipe(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    ingredients = relationship("Ingredient", back_populates="recipe", cascade="all, delete-orphan")
+    # Always batch-load ingredients (IN lists are chunked by SQLAlchemy) so
+    # code paths without explicit loader options don't fall into N+1 lazy loads
+    ingredients = relationship("Ingredient", back_populates="recipe", cascade="all, delete-orphan", lazy="selectin")
+
+    __table_args__ = (
+        Index("ix_recipes_is_favorite_id", "is_favorite", "id"),
+    )
 
 class Ingredient(Base):
     __tablename__ = "ingredients"
 
     id = Column(Integer, primary_key=True, index=True)
     text = Column(String, nullable=False)
-    recipe_id = Column(Integer, ForeignKey("recipes.id"))
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), index=True)
 
     recipe = relationship("Recipe", back_populates="ingredients")
 
@@ -51,6 +57,20 @@ class MealPlanEntry(Base):
     recipe = relationship("Recipe")
     meal_type = Column(String, default="Dinner")
 
+    __table_args__ = (
+        Index("ix_mpe_date_mealtype_recipe", "date", "meal_type", "recipe_id"),
+    )
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    input_hash = Column(String, primary_key=True)  # Digest of kind, prompt version, model and content
+    prompt_version = Column(String, nullable=False)
+    model_id = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
 class Setting(Base):
     __tablename__ = "settings"
 
@@ -1,33 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
 import crud
 import schemas
+import cache
+import jobs
 from database import SessionLocal
+from dependencies import get_db
 
 router = APIRouter()
+logger = logging.getLogger("lmeals.allergens")
+
+import llm
 
-# Dependency to get the database session
-def get_db():
+def background_expand_keywords(allergen_id: int, allergen_name: str):
+    """Background task to expand an allergen's keywords with the LLM."""
+    keywords = llm.expand_allergen_keywords(allergen_name)
     db = SessionLocal()
     try:
-        yield db
+        if crud.update_allergen_keywords(db, allergen_id=allergen_id, keywords=keywords):
+            cache.bump_allergen_version()
+            logger.info("Stored %d keywords for allergen '%s'", len(keywords), allergen_name)
+    except Exception:
+        logger.exception("Failed to expand keywords for allergen '%s'", allergen_name)
     finally:
         db.close()
 
-import llm
-
 @router.post("/allergens", response_model=schemas.Allergen)
-def create_allergen(allergen: schemas.AllergenCreate, db: Session = Depends(get_db)):
-    db_allergen = crud.get_allergen_by_name(db, name=allergen.name)
-    if db_allergen:
+def create_allergen(allergen: schemas.AllergenCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # Match on the name right away; the LLM keyword expansion follows in the background
+    db_allergen = crud.create_allergen(db=db, allergen=allergen, keywords=[allergen.name.lower()])
+    if db_allergen is None:
         raise HTTPException(status_code=400, detail="Allergen already exists")
-    
-    # Expand keywords using LLM
-    keywords = llm.expand_allergen_keywords(allergen.name)
-    
-    return crud.create_allergen(db=db, allergen=allergen, keywords=keywords)
+    cache.bump_allergen_version()
+    background_tasks.add_task(jobs.submit, background_expand_keywords, db_allergen.id, allergen.name)
+    return db_allergen
 
 @router.get("/allergens", response_model=List[schemas.Allergen])
 def read_allergens(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -39,4 +49,5 @@ def delete_allergen(allergen_id: int, db: Session = Depends(get_db)):
     db_allergen = crud.delete_allergen(db, allergen_id=allergen_id)
     if db_allergen is None:
         raise HTTPException(status_code=404, detail="Allergen not found")
+    cache.bump_allergen_version()
     return db_allergen
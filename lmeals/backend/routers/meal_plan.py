@@ -5,20 +5,13 @@ from datetime import date
 
 import crud
 import schemas
-from database import SessionLocal
+from dependencies import get_db
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/meal-plan", response_model=List[schemas.MealPlanEntry])
 def read_meal_plan_entries(start_date: date, end_date: date, db: Session = Depends(get_db)):
-    return crud.get_meal_plan_entries(db, start_date=str(start_date), end_date=str(end_date))
+    return crud.get_meal_plan_entries(db, start_date=start_date, end_date=end_date)
 
 @router.post("/meal-plan", response_model=schemas.MealPlanEntry)
 def create_meal_plan_entry(entry: schemas.MealPlanEntryCreate, db: Session = Depends(get_db)):
@@ -27,6 +20,13 @@ def create_meal_plan_entry(entry: schemas.MealPlanEntryCreate, db: Session = Dep
         raise HTTPException(status_code=404, detail="Recipe not found")
     return db_entry
 
+@router.post("/meal-plan/bulk", response_model=List[schemas.MealPlanEntry])
+def create_meal_plan_entries(entries: List[schemas.MealPlanEntryCreate], db: Session = Depends(get_db)):
+    db_entries = crud.create_meal_plan_entries(db, entries=entries)
+    if db_entries is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return db_entries
+
 @router.delete("/meal-plan/{entry_id}", response_model=schemas.MealPlanEntry)
 def delete_meal_plan_entry(entry_id: int, db: Session = Depends(get_db)):
     db_entry = crud.delete_meal_plan_entry(db, entry_id=entry_id)
@@ -1,67 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, File, UploadFile, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
-
-import crud, schemas, scraper, llm, allergen_checker, audio_processor, assets
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import copy
+import hashlib
+import logging
 import os
+import re
+import shutil
+import threading
+import uuid
+
+import crud, schemas, scraper, llm, allergen_checker, audio_processor, assets, cache, jobs
 from database import SessionLocal
+from dependencies import get_db
 from assets import STATIC_DIR
 
 router = APIRouter()
+logger = logging.getLogger("lmeals.recipes")
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Serialized recipe list pages keyed by their ETag
+_recipe_list_adapter = TypeAdapter(List[schemas.RecipeListItem])
+_recipe_list_bodies = cache.TTLCache(maxsize=64, ttl=300)
+# Serialized /recipes/{id} bodies and their ETags keyed by (id, DB fingerprint, write version)
+_recipe_bodies = cache.TTLCache(maxsize=256, ttl=300)
+
+# Recipes with a template generation running, so repeated GETs of a legacy
+# recipe don't start duplicate LLM calls. Single-process deployment only.
+_templates_in_flight: set[int] = set()
+_templates_in_flight_lock = threading.Lock()
 
 def background_generate_template(recipe_id: int):
     """Background task to generate instruction template for a recipe."""
-    db = SessionLocal()
+    with _templates_in_flight_lock:
+        if recipe_id in _templates_in_flight:
+            return
+        _templates_in_flight.add(recipe_id)
     try:
-        recipe = crud.get_recipe(db, recipe_id=recipe_id)
-        if recipe and recipe.instructions and not recipe.instruction_template:
-            print(f"Background: Generating template for recipe {recipe_id}")
-            template = llm.generate_instruction_template(recipe.instructions)
-            if template:
-                # Update manually to avoid full schema validation if needed
-                recipe.instruction_template = template
-                db.commit()
-                print(f"Background: Template generated for recipe {recipe_id}")
-    except Exception as e:
-        print(f"Background Error: Failed to generate template for recipe {recipe_id}: {e}")
+        # Hold a pooled connection only around the reads/writes, not the LLM call
+        with SessionLocal() as db:
+            instructions = crud.get_instructions_needing_template(db, recipe_id)
+        if not instructions:
+            return
+
+        logger.info("Generating template for recipe %s", recipe_id)
+        template = llm.generate_instruction_template(instructions)
+        if template:
+            with SessionLocal() as db:
+                if crud.set_instruction_template(db, recipe_id, template):
+                    logger.info("Template generated for recipe %s", recipe_id)
+    except Exception:
+        logger.exception("Failed to generate template for recipe %s", recipe_id)
     finally:
-        db.close()
+        with _templates_in_flight_lock:
+            _templates_in_flight.discard(recipe_id)
+
+def background_localize_image(recipe_id: int, remote_url: str):
+    """Background task to download a recipe's remote image and switch the recipe to the local copy."""
+    local_image = assets.download_image(remote_url)
+    if not local_image:
+        return
+
+    patched = False
+    try:
+        with SessionLocal() as db:
+            recipe = crud.get_recipe(db, recipe_id=recipe_id)
+            # Only patch if the image wasn't changed (e.g. by finalize-scrape) meanwhile
+            if recipe and recipe.image_url == remote_url:
+                recipe.image_url = local_image
+                db.commit()
+                patched = True
+    except Exception:
+        logger.exception("Failed to store local image for recipe %s", recipe_id)
+
+    if not patched:
+        assets.delete_image(local_image)
 
 def background_upgrade_frame_quality(source_url: str, timestamp: float, image_path: str):
     """Background task to upgrade a low-res frame to high-res."""
-    import os
-    import assets
-    
     try:
         # Build absolute path to the image
         abs_path = os.path.join(assets.STATIC_DIR, image_path)
         
         if not os.path.exists(abs_path):
-            print(f"Background: Image not found for upgrade: {abs_path}")
+            logger.warning("Image not found for upgrade: %s", abs_path)
             return
             
-        print(f"Background: Starting high-res upgrade for {image_path} at {timestamp}s...")
+        logger.info("Starting high-res upgrade for %s at %ss", image_path, timestamp)
         success = audio_processor.download_high_res_frame(source_url, timestamp, abs_path)
         
         if success:
-            print(f"Background: High-res upgrade successful for {image_path}")
+            logger.info("High-res upgrade successful for %s", image_path)
+            assets.generate_thumbnail(image_path)
         else:
-            print(f"Background: High-res upgrade failed for {image_path}, keeping low-res version")
+            logger.warning("High-res upgrade failed for %s, keeping low-res version", image_path)
             
-    except Exception as e:
-        print(f"Background Error: Failed to upgrade frame quality: {e}")
+    except Exception:
+        logger.exception("Failed to upgrade frame quality for %s", image_path)
+
+
+# The async scrape handlers run their database work in the threadpool so a
+# slow SQLite commit never stalls the event loop. The response model is built
+# in the same thread, so relationship loads don't run on the loop either.
+def _create_recipe_out(db: Session, recipe: schemas.RecipeCreate) -> schemas.Recipe:
+    return schemas.Recipe.model_validate(crud.create_recipe(db, recipe=recipe))
+
+def _update_recipe_out(db: Session, recipe_id: int, recipe: schemas.RecipeCreate) -> Optional[schemas.Recipe]:
+    db_recipe = crud.update_recipe(db, recipe_id=recipe_id, recipe=recipe)
+    return schemas.Recipe.model_validate(db_recipe) if db_recipe else None
+
+def _set_recipe_image_out(db: Session, db_recipe, image_url: str) -> schemas.Recipe:
+    db_recipe.image_url = image_url
+    recipe_id = db_recipe.id
+    db.commit()
+    return schemas.Recipe.model_validate(crud.get_recipe(db, recipe_id))
 
 
 @router.post("/scrape", response_model=schemas.ScrapeResponse)
-def scrape_recipe(scrape_request: schemas.ScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def scrape_recipe(scrape_request: schemas.ScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Scrapes a recipe from a URL.
     1. Tries to scrape using the recipe-scrapers library.
@@ -70,35 +130,229 @@ def scrape_recipe(scrape_request: schemas.ScrapeRequest, background_tasks: Backg
     """
     try:
         # Ensure url is a string before passing to scraper
-        recipe_data = scraper.scrape_with_library(str(scrape_request.url))
+        url = str(scrape_request.url)
+        # Fetch on the shared async client; the HTML is parsed in a worker process
+        html = await scraper.get_html_async(url)
+        recipe_data = await scraper.scrape_html_async(url, html) if html else None
         if recipe_data:
-            # Download image locally
-            if recipe_data.get("image_url"):
-                local_image = assets.download_image(str(recipe_data["image_url"]))
-                if local_image:
-                    recipe_data["image_url"] = local_image
-            
             recipe_create = schemas.RecipeCreate(**recipe_data)
-            new_recipe = crud.create_recipe(db, recipe=recipe_create)
-            
+            new_recipe = await run_in_threadpool(_create_recipe_out, db, recipe_create)
+
+            # Download the image locally after responding
+            if new_recipe.image_url and new_recipe.image_url.startswith("http"):
+                background_tasks.add_task(jobs.submit, background_localize_image, new_recipe.id, new_recipe.image_url)
+
             # Start background templating
-            background_tasks.add_task(background_generate_template, new_recipe.id)
+            background_tasks.add_task(jobs.submit, background_generate_template, new_recipe.id)
             
             # Manually construct and validate response to avoid hidden 500 errors in response validation
             response_obj = schemas.ScrapeResponse(status="success", recipe=new_recipe)
             return response_obj
     except Exception as e:
-        print(f"ERROR during scraping execution: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Scraping failed for %s", scrape_request.url)
         raise HTTPException(status_code=400, detail=f"Scraping failed: {str(e)}")
     
     # If library scraping fails, signal to the frontend that AI is an option
     return schemas.ScrapeResponse(status="ai_required", message="Standard scraping failed. Would you like to try with AI?")
 
 
+# Hosts handled by the video/audio pipeline, matched on the hostname (and its
+# subdomains) so a blog URL merely mentioning "youtube.com" isn't misrouted
+_VIDEO_AUDIO_HOST = re.compile(r"(?:^|\.)(?:youtube\.com|youtu\.be|vimeo\.com|spotify\.com|facebook\.com|instagram\.com)$")
+
+def _is_video_audio_url(url: str) -> bool:
+    return bool(_VIDEO_AUDIO_HOST.search(urlparse(url).hostname or ""))
+
+def _item_text(item, dict_keys: tuple[str, ...]):
+    """Flattens one AI-returned list item (string, list of parts or dict) to text."""
+    if isinstance(item, list):
+        return " ".join(str(x) for x in item)
+    if isinstance(item, dict):
+        for key in dict_keys:
+            if key in item:
+                return item[key]
+        return str(item)
+    return str(item)
+
+def _sanitize_ai_recipe(recipe: dict):
+    """Normalizes the ingredients and instructions of an AI-extracted recipe in place."""
+    recipe["ingredients"] = [{"text": _item_text(i, ("text", "name"))} for i in recipe.get("ingredients", [])]
+    recipe["instructions"] = [_item_text(inst, ("text",)) for inst in recipe.get("instructions", [])]
+
+def _discard_media_candidates(frames_future, image_future):
+    """Deletes the frames/image produced for a video scrape that failed."""
+    paths = list(frames_future.result() or [])
+    if image_future and image_future.result():
+        paths.append(image_future.result())
+    assets.delete_candidates([p for p in paths if "candidates/" in p])
+    for path in paths:
+        if "candidates/" not in path:
+            assets.delete_image(path)
+
+def _extract_recipes_from_media(url: str):
+    """
+    Blocking video/audio pipeline: metadata, recipe link or transcript, AI
+    extraction and preview frames. Returns (recipes, candidates, default_thumbnail).
+    """
+    logger.info("Video/Audio detected: %s", url)
+    # Preview frames only need the URL, so the clip download and ffmpeg runs
+    # overlap with the transcript and AI extraction instead of following them
+    executor = ThreadPoolExecutor(max_workers=2)
+    frames_future = executor.submit(audio_processor.capture_video_frames, url)
+    image_future = None
+    try:
+        metadata = audio_processor.get_video_metadata(url)
+    
+        transcript = ""
+        scraped_image = None
+    
+        # 1. OPTIMIZATION: Check description for recipe link FIRST
+        # If found, use it and SKIP slow audio transcription
+        description = metadata.get("description", "")
+        if description:
+            logger.debug("Checking description for recipe links")
+            # Pass the video title to help the AI find the RELEVANT link
+            recipe_link = llm.extract_recipe_link(description, video_title=metadata.get("title", ""))
+        
+            if recipe_link:
+                logger.info("Found recipe link: %s", recipe_link)
+                scraped_data = audio_processor.scrape_recipe_from_link(recipe_link)
+            
+                if scraped_data:
+                    if scraped_data.get("html"):
+                        # Treat the scraped content as the "transcript" for the AI
+                        logger.info("Using scraped content instead of audio transcription")
+                        transcript = f"Title: {metadata['title']}\n\n[RECIPE CONTENT FROM {recipe_link}]:\n{scraped_data['html']}"
+                    
+                    if scraped_data.get("image_url"):
+                        logger.debug("Found image in scraped content: %s", scraped_data["image_url"])
+                        scraped_image = scraped_data["image_url"]
+                        image_future = executor.submit(assets.download_image, scraped_image)
+                    
+        # 2. If no recipe link content, fallback to Subtitles/Audio
+        if not transcript:
+            # Try subtitles first
+            subtitles = metadata.get("subtitles", {})
+            if subtitles:
+                logger.debug("Fetching existing subtitles/captions")
+                # The caption track URLs come with the metadata; no second extraction
+                transcript = audio_processor.get_subtitle_text(url, metadata=metadata)
+            
+            # Fallback to audio transcription
+            if not transcript:
+                logger.info("No subtitles found, proceeding with transcription")
+                audio_file = audio_processor.download_audio(url)
+                try:
+                    # Chunks are split in memory; only the download touches disk
+                    chunks = audio_processor.chunk_audio(audio_file)
+                finally:
+                    audio_processor.cleanup_files([audio_file])
+            
+                texts = llm.transcribe_audio_chunks(chunks)
+                transcript = "\n".join(texts)
+
+        # 3. Final fallback to description if everything else fails
+        if not transcript:
+            transcript = f"Title: {metadata['title']}\nDescription: {metadata['description']}"
+
+        # Pass metadata (especially description) to help the AI when transcript is poor
+        extracted = llm.extract_recipe_from_text(transcript, metadata=metadata)
+        if not extracted:
+            raise HTTPException(status_code=500, detail="AI failed to extract recipe from transcript.")
+    
+        # extracted is now an ARRAY of recipe dicts
+        recipes_array = extracted
+    except BaseException:
+        # Don't leave orphaned candidates behind when extraction fails
+        jobs.submit(_discard_media_candidates, frames_future, image_future)
+        raise
+    finally:
+        executor.shutdown(wait=False)
+    
+    # Store video frame candidates for later use
+    # 4. Use Default Thumbnail if available
+    default_thumbnail = metadata.get("thumbnail")
+
+    # 5. Preview frames (0s, 5s, 10s, 15s) were generated in parallel
+    candidates = frames_future.result()
+    
+    # 6. If scraped image available, REPLACE the last option (15s frame) with it
+    if image_future:
+        scraped_img_local = image_future.result()
+        if scraped_img_local:
+            if candidates:
+                removed = candidates.pop() # Remove the last one (15s)
+                logger.debug("Removed 15s frame candidate: %s", removed)
+            candidates.append(scraped_img_local)
+            logger.debug("Added scraped image as candidate: %s", scraped_img_local)
+
+    return recipes_array, candidates, default_thumbnail
+
+
+# Concurrent /scrape-ai calls for the same URL share one extraction instead
+# of each paying for the download, transcription and LLM calls
+_scrapes_in_flight: dict[tuple, asyncio.Future] = {}
+
+class _OwnerCancelled(Exception):
+    """Set on a shared future when the request running it went away."""
+
+async def _single_flight(key: tuple, fn, *args):
+    """
+    Awaits fn(*args) once per key; callers arriving while it runs wait for the
+    same result. Returns (deep copy of the result, whether this call ran it).
+    If the running call is cancelled, a waiting caller takes over the work.
+    """
+    while (future := _scrapes_in_flight.get(key)) is not None:
+        try:
+            return copy.deepcopy(await asyncio.shield(future)), False
+        except _OwnerCancelled:
+            continue
+
+    future = asyncio.get_running_loop().create_future()
+    _scrapes_in_flight[key] = future
+    try:
+        result = await fn(*args)
+    except asyncio.CancelledError:
+        # Cancelling the future would cancel every waiter with it
+        future.set_exception(_OwnerCancelled())
+        future.exception()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved in case nobody else was waiting
+        raise
+    else:
+        future.set_result(result)
+        return copy.deepcopy(result), True
+    finally:
+        _scrapes_in_flight.pop(key, None)
+
+def _clone_candidates(candidates: list, default_thumbnail):
+    """
+    Gives a caller that shared another request's extraction its own candidate
+    files, so either user's cleanup can't delete the other's gallery.
+    """
+    clones = {}
+    for path in candidates or []:
+        if "candidates/" not in path:
+            continue
+        suffix = os.path.basename(path).split("_", 1)[-1]
+        clone = f"images/recipes/candidates/{uuid.uuid4()}_{suffix}"
+        try:
+            assets.promote_candidate(os.path.join(STATIC_DIR, path), os.path.join(STATIC_DIR, clone), keep_source=True)
+            clones[path] = clone
+        except OSError:
+            logger.exception("Failed to clone candidate %s", path)
+    return [clones.get(p, p) for p in candidates or []], clones.get(default_thumbnail, default_thumbnail)
+
+async def _fetch_and_extract_html(url: str):
+    html = await scraper.get_html_async(url)
+    if not html:
+        raise HTTPException(status_code=400, detail="Could not fetch HTML from the URL.")
+    return await run_in_threadpool(llm.extract_with_groq, html)
+
 @router.post("/scrape-ai")
-def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Scrapes a recipe from a URL using AI. 
     Supports standard HTML pages and Video/Audio sources.
@@ -107,105 +361,22 @@ def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: Backgroun
     """
     url = str(scrape_request.url)
     recipe_data = {}
-    is_video_audio = any(domain in url for domain in ["youtube.com", "youtu.be", "vimeo.com", "spotify.com", "facebook.com", "instagram.com"])
+    is_video_audio = _is_video_audio_url(url)
 
     if is_video_audio:
         try:
-            print(f"Video/Audio detected: {url}")
-            metadata = audio_processor.get_video_metadata(url)
-            recipe_data["title"] = metadata["title"]
-            recipe_data["image_url"] = metadata["thumbnail"] 
-            
-            transcript = ""
-            scraped_image = None
-            
-            # 1. OPTIMIZATION: Check description for recipe link FIRST
-            # If found, use it and SKIP slow audio transcription
-            description = metadata.get("description", "")
-            if description:
-                print("Checking description for recipe links...")
-                # Pass the video title to help the AI find the RELEVANT link
-                recipe_link = llm.extract_recipe_link(description, video_title=metadata.get("title", ""))
-                
-                if recipe_link:
-                    print(f"Found recipe link: {recipe_link}")
-                    scraped_data = audio_processor.scrape_recipe_from_link(recipe_link)
-                    
-                    if scraped_data:
-                        if scraped_data.get("html"):
-                            # Treat the scraped content as the "transcript" for the AI
-                            print("Using scraped content instead of audio transcription.")
-                            transcript = f"Title: {metadata['title']}\n\n[RECIPE CONTENT FROM {recipe_link}]:\n{scraped_data['html']}"
-                            
-                        if scraped_data.get("image_url"):
-                            print(f"Found image in scraped content: {scraped_data['image_url']}")
-                            scraped_image = scraped_data["image_url"]
-                            
-            # 2. If no recipe link content, fallback to Subtitles/Audio
-            if not transcript:
-                # Try subtitles first
-                subtitles = metadata.get("subtitles", {})
-                if subtitles:
-                    print("Fetching existing subtitles/captions...")
-                    transcript = audio_processor.get_subtitle_text(url)
-                    
-                # Fallback to audio transcription
-                if not transcript:
-                    print("No active subtitles found. Proceeding with transcription...")
-                    audio_file = audio_processor.download_audio(url)
-                    chunks = audio_processor.chunk_audio(audio_file)
-                    
-                    texts = []
-                    for chunk in chunks:
-                        texts.append(llm.transcribe_audio(chunk))
-                    
-                    transcript = "\n".join(texts)
-                    audio_processor.cleanup_files([audio_file] + chunks)
-
-            # 3. Final fallback to description if everything else fails
-            if not transcript:
-                transcript = f"Title: {metadata['title']}\nDescription: {metadata['description']}"
-
-            # Pass metadata (especially description) to help the AI when transcript is poor
-            extracted = llm.extract_recipe_from_text(transcript, metadata=metadata)
-            if not extracted:
-                raise HTTPException(status_code=500, detail="AI failed to extract recipe from transcript.")
-            
-            # extracted is now an ARRAY of recipe dicts
-            recipes_array = extracted
-            
-            # Store video frame candidates for later use
-            # 4. Use Default Thumbnail if available
-            default_thumbnail = metadata.get("thumbnail")
-
-            # 5. Generate preview frames (0s, 5s, 10s, 15s)
-            print(f"Generating preview frames for {url}...")
-            candidates = audio_processor.capture_video_frames(url)
-            
-            # 6. If scraped image available, REPLACE the last option (15s frame) with it
-            if scraped_image:
-                print(f"Downloading scraped image from {scraped_image}...")
-                scraped_img_local = assets.download_image(scraped_image)
-                if scraped_img_local:
-                    if candidates:
-                        removed = candidates.pop() # Remove the last one (15s)
-                        print(f"Removed 15s frame candidate: {removed}")
-                    candidates.append(scraped_img_local)
-                    print(f"Added scraped image as candidate: {scraped_img_local}")
-            
+            (recipes_array, candidates, default_thumbnail), owner = await _single_flight(
+                ("media", url), run_in_threadpool, _extract_recipes_from_media, url
+            )
         except Exception as e:
-            print(f"ERROR: Video/Audio processing failed for {url}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Video/Audio processing failed for %s", url)
             raise HTTPException(status_code=500, detail=f"Video/Audio processing error: {str(e)}")
+        if not owner:
+            candidates, default_thumbnail = await run_in_threadpool(_clone_candidates, candidates, default_thumbnail)
     else:
         # Standard HTML Scraping
-        html = scraper.get_html(scrape_request.url)
-        if not html:
-            raise HTTPException(status_code=400, detail="Could not fetch HTML from the URL.")
-
         try:
-            extracted = llm.extract_with_groq(html)
+            extracted, _ = await _single_flight(("html", url), _fetch_and_extract_html, url)
             if not extracted:
                 raise HTTPException(status_code=500, detail="AI failed to extract recipe data.")
             
@@ -213,39 +384,19 @@ def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: Backgroun
             recipes_array = extracted
             candidates = []  # No video frames for HTML
             default_thumbnail = None
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
     # Now handle the array: single recipe = create immediately, multiple = return for selection
-    print(f"DEBUG: AI returned {len(recipes_array)} recipe(s)")
+    logger.debug("AI returned %d recipe(s)", len(recipes_array))
     if len(recipes_array) == 1:
         # SINGLE RECIPE PATH (Backward Compatible)
         recipe_data = recipes_array[0]
         recipe_data['source_url'] = scrape_request.url
 
-        # Sanitize ingredients
-        ingredients_list = recipe_data.get("ingredients", [])
-        sanitized_ingredients = []
-        for i in ingredients_list:
-            if isinstance(i, list):
-                sanitized_ingredients.append(" ".join(str(x) for x in i))
-            elif isinstance(i, dict):
-                sanitized_ingredients.append(i.get("text", i.get("name", str(i))))
-            else:
-                sanitized_ingredients.append(str(i))
-        recipe_data["ingredients"] = [{"text": i} for i in sanitized_ingredients]
-        
-        # Sanitize instructions
-        instructions_list = recipe_data.get("instructions", [])
-        sanitized_instructions = []
-        for inst in instructions_list:
-            if isinstance(inst, list):
-                 sanitized_instructions.append(" ".join(str(x) for x in inst))
-            elif isinstance(inst, dict):
-                 sanitized_instructions.append(inst.get("text", str(inst)))
-            else:
-                 sanitized_instructions.append(str(inst))
-        recipe_data["instructions"] = sanitized_instructions
+        _sanitize_ai_recipe(recipe_data)
         
         # Handle image - use default_thumbnail if available
         if not recipe_data.get("image_url") and default_thumbnail:
@@ -253,20 +404,23 @@ def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: Backgroun
         elif not recipe_data.get("image_url"):
             recipe_data["image_url"] = None
             
-        # Download image if present
-        if recipe_data.get("image_url"):
-            local_image = assets.download_image(str(recipe_data["image_url"]))
+        # The video gallery needs the local copy as a candidate now; otherwise
+        # the image is downloaded after responding
+        if recipe_data.get("image_url") and candidates:
+            local_image = await run_in_threadpool(assets.download_image, str(recipe_data["image_url"]))
             if local_image:
                 recipe_data["image_url"] = local_image
-                if candidates and local_image not in candidates:
+                if local_image not in candidates:
                     candidates.insert(0, local_image)
 
         # Create recipe in DB
         recipe_create = schemas.RecipeCreate(**recipe_data)
-        new_recipe = crud.create_recipe(db, recipe=recipe_create)
+        new_recipe = await run_in_threadpool(_create_recipe_out, db, recipe_create)
+        if new_recipe.image_url and new_recipe.image_url.startswith("http"):
+            background_tasks.add_task(jobs.submit, background_localize_image, new_recipe.id, new_recipe.image_url)
         
         # Start background templating
-        background_tasks.add_task(background_generate_template, new_recipe.id)
+        background_tasks.add_task(jobs.submit, background_generate_template, new_recipe.id)
         
         return schemas.ScrapeResponse(
             status="success", 
@@ -282,29 +436,7 @@ def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: Backgroun
         for recipe_dict in recipes_array:
             recipe_dict['source_url'] = scrape_request.url
             
-            # Sanitize ingredients
-            ingredients_list = recipe_dict.get("ingredients", [])
-            sanitized_ingredients = []
-            for i in ingredients_list:
-                if isinstance(i, list):
-                    sanitized_ingredients.append(" ".join(str(x) for x in i))
-                elif isinstance(i, dict):
-                    sanitized_ingredients.append(i.get("text", i.get("name", str(i))))
-                else:
-                    sanitized_ingredients.append(str(i))
-            recipe_dict["ingredients"] = [{"text": i} for i in sanitized_ingredients]
-            
-            # Sanitize instructions
-            instructions_list = recipe_dict.get("instructions", [])
-            sanitized_instructions = []
-            for inst in instructions_list:
-                if isinstance(inst, list):
-                     sanitized_instructions.append(" ".join(str(x) for x in inst))
-                elif isinstance(inst, dict):
-                     sanitized_instructions.append(inst.get("text", str(inst)))
-                else:
-                     sanitized_instructions.append(str(inst))
-            recipe_dict["instructions"] = sanitized_instructions
+            _sanitize_ai_recipe(recipe_dict)
             
             # Set default thumbnail if no image
             if not recipe_dict.get("image_url") and default_thumbnail:
@@ -323,76 +455,95 @@ def scrape_ai(scrape_request: schemas.ScrapeRequest, background_tasks: Backgroun
         )
 
 
+_UPLOAD_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+# 1 MB copy buffer: far fewer read/write syscalls than the 64 KB default
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Candidate filename format: {uuid}_frame_{timestamp}s.jpg
+_FRAME_TIMESTAMP = re.compile(r'_frame_(\d+(\.\d+)?)s')
+
+def _copy_upload(src, dest):
+    """
+    Copies an upload into `dest`. Uploads Starlette already spilled to a temp
+    file are copied in the kernel with copy_file_range; small in-memory ones
+    (or filesystems that refuse it) use a buffered copy.
+    """
+    start = src.tell()
+    # SpooledTemporaryFile.fileno() would force an in-memory upload onto disk
+    if getattr(src, "_rolled", True) and hasattr(os, "copy_file_range"):
+        try:
+            src_fd, dest_fd, offset = src.fileno(), dest.fileno(), start
+            while copied := os.copy_file_range(src_fd, dest_fd, 64 * _UPLOAD_CHUNK_SIZE, offset):
+                offset += copied
+            return
+        except (OSError, AttributeError, ValueError):
+            dest.seek(0)
+            dest.truncate()
+            src.seek(start)
+    shutil.copyfileobj(src, dest, length=_UPLOAD_CHUNK_SIZE)
+
 @router.post("/upload-temp-image")
 async def upload_temp_image(file: UploadFile = File(...)):
     """
     Uploads a temporary image to the candidates directory for the gallery.
     """
-    import assets
-    import uuid
-    import shutil
-    import os
-    
-    output_dir = os.path.join(assets.IMAGES_DIR, "candidates")
-    os.makedirs(output_dir, exist_ok=True)
-    
     file_id = str(uuid.uuid4())
-    # Keep original extension if possible
-    ext = os.path.splitext(file.filename)[1] or ".jpg"
+    # Keep original extension if it's a known image type
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in _UPLOAD_IMAGE_EXTENSIONS:
+        ext = ".jpg"
     filename = f"upload_{file_id}{ext}"
-    filepath = os.path.join(output_dir, filename)
+    filepath = os.path.join(assets.CANDIDATES_DIR, filename)
     
-    try:
+    def _save_upload():
         with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            _copy_upload(file.file, buffer)
+
+    try:
+        # Disk writes run off the event loop
+        await run_in_threadpool(_save_upload)
         
         relative_path = f"images/recipes/candidates/{filename}"
-        print(f"DEBUG: Manually uploaded image saved to {relative_path}")
+        logger.debug("Manually uploaded image saved to %s", relative_path)
         return {"status": "success", "url": relative_path}
     except Exception as e:
-        print(f"Error uploading temp image: {e}")
+        logger.exception("Error uploading temp image")
         raise HTTPException(status_code=500, detail=str(e))
 
-def delayed_cleanup_files(files_to_delete: List[str], keep_file: Optional[str] = None):
+# The frontend may still be showing the gallery right after it asks for cleanup
+_CLEANUP_DELAY_SECONDS = 10
+
+def cleanup_candidate_files(files_to_delete: List[str], keep_file: Optional[str] = None):
     """
-    Waits 10 seconds and deletes files.
+    Deletes gallery candidate files, except `keep_file`.
     """
-    import time
-    import assets
-    time.sleep(10)
-    print(f"Background: Starting cleanup of {len(files_to_delete)} candidates...")
+    logger.info("Starting cleanup of %d candidates", len(files_to_delete))
     
-    for f in files_to_delete:
-        if not f: continue
-        # Don't delete the one we want to keep!
-        if keep_file and f == keep_file:
-            continue
-            
-        assets.delete_image(f)
+    # Don't delete the one we want to keep!
+    files = [f for f in files_to_delete if f and f != keep_file]
+    assets.delete_candidates([f for f in files if "candidates/" in f])
+    for f in files:
+        if "candidates/" not in f:
+            assets.delete_image(f)
 
 @router.post("/cleanup-images")
 def cleanup_images_endpoint(payload: schemas.CleanupRequest, background_tasks: BackgroundTasks):
     """
     Triggers background deletion of rejected image candidates.
     """
-    background_tasks.add_task(delayed_cleanup_files, payload.files_to_delete, payload.keep_file)
+    background_tasks.add_task(jobs.submit_later, _CLEANUP_DELAY_SECONDS, cleanup_candidate_files, payload.files_to_delete, payload.keep_file)
     return {"status": "queued"}
 
 @router.post("/finalize-scrape", response_model=schemas.ScrapeResponse)
-def finalize_scrape(payload: schemas.FinalizeScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def finalize_scrape(payload: schemas.FinalizeScrapeRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Finalizes a scrape by setting the chosen image and cleaning up candidates.
     Moves the chosen image from candidates/ to images/ to make it permanent.
     """
-    import shutil
-    import os
-    import assets
-    
     recipe_id = payload.recipe_data.id
     chosen_image = payload.chosen_image
     
     # 1. Update the recipe in DB
-    db_recipe = crud.get_recipe(db, recipe_id=recipe_id)
+    db_recipe = await run_in_threadpool(crud.get_recipe, db, recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -401,20 +552,19 @@ def finalize_scrape(payload: schemas.FinalizeScrapeRequest, background_tasks: Ba
     if "candidates/" in chosen_image:
         try:
             filename = os.path.basename(chosen_image)
-            source_path = os.path.join(assets.IMAGES_DIR, "candidates", filename)
+            source_path = os.path.join(assets.CANDIDATES_DIR, filename)
             dest_filename = filename.replace("upload_", "").replace("frame_", "selected_")
             dest_path = os.path.join(assets.IMAGES_DIR, dest_filename)
             
             if os.path.exists(source_path):
                 # CHECK FOR FRAME CANDIDATE
-                import re
-                # Candidate filename format: {uuid}_frame_{timestamp}s.jpg
-                match = re.search(r'_frame_(\d+(\.\d+)?)s', filename)
+                match = _FRAME_TIMESTAMP.search(filename)
                 
                 # Move the low-res frame immediately
-                shutil.move(source_path, dest_path)
+                await run_in_threadpool(assets.promote_candidate, source_path, dest_path)
                 final_image_path = f"images/recipes/{dest_filename}"
-                print(f"DEBUG: Moved candidate image to permanent storage: {final_image_path}")
+                logger.debug("Moved candidate image to permanent storage: %s", final_image_path)
+                background_tasks.add_task(jobs.submit, assets.generate_thumbnail, final_image_path)
                 
                 # If it's a video frame, trigger background upgrade to high-res
                 if match:
@@ -424,34 +574,33 @@ def finalize_scrape(payload: schemas.FinalizeScrapeRequest, background_tasks: Ba
                         
                         if source_url:
                             # Schedule background upgrade - this will overwrite the file with high-res
-                            print(f"DEBUG: Scheduling background high-res upgrade for frame at {timestamp}s...")
+                            logger.debug("Scheduling background high-res upgrade for frame at %ss", timestamp)
                             background_tasks.add_task(
+                                jobs.submit,
                                 background_upgrade_frame_quality,
                                 str(source_url),
                                 timestamp,
                                 final_image_path
                             )
-                    except Exception as e:
-                        print(f"ERROR scheduling background upgrade: {e}")
-        except Exception as e:
-            print(f"ERROR moving candidate image: {e}")
+                    except Exception:
+                        logger.exception("Failed to schedule background upgrade")
+        except Exception:
+            logger.exception("Failed to move candidate image %s", chosen_image)
             # Fallback: keep the original path if move fails
             pass
 
     # Update DB
-    db_recipe.image_url = final_image_path
-    db.commit()
-    db.refresh(db_recipe)
+    recipe_out = await run_in_threadpool(_set_recipe_image_out, db, db_recipe, final_image_path)
     
     # 3. Trigger cleanup for other candidates
     if payload.candidates_to_cleanup:
         # We pass the full list and the original chosen path (before move) to keep
         # Wait, if we moved it, the source path doesn't exist anymore anyway.
-        # But delayed_cleanup uses delete_image which prepends IMAGES_DIR...
+        # But cleanup_candidate_files uses delete_image which prepends IMAGES_DIR...
         # Let's ensure candidate cleanup works.
-        background_tasks.add_task(delayed_cleanup_files, payload.candidates_to_cleanup, chosen_image)
+        background_tasks.add_task(jobs.submit_later, _CLEANUP_DELAY_SECONDS, cleanup_candidate_files, payload.candidates_to_cleanup, chosen_image)
         
-    return schemas.ScrapeResponse(status="success", recipe=db_recipe)
+    return schemas.ScrapeResponse(status="success", recipe=recipe_out)
 
 
 @router.post("/finalize-multi-scrape")
@@ -463,7 +612,7 @@ def finalize_multi_scrape(
     """
     Finalizes a multi-recipe scrape by batch-creating recipes with assigned images.
     """
-    created_recipes = []
+    recipe_creates = []
     
     for idx, recipe_dict in enumerate(payload.recipes_data):
         # Get assigned image for this recipe
@@ -482,24 +631,20 @@ def finalize_multi_scrape(
                 ext = candidate_filename.split('.')[-1]
                 new_filename = f"{prefix}_selected.{ext}"
                 
-                # Full paths
-                # Full paths
-                import assets
-                candidates_dir = os.path.join(assets.STATIC_DIR, "images", "recipes", "candidates")
-                images_dir = os.path.join(assets.STATIC_DIR, "images", "recipes")
-                old_path = os.path.join(candidates_dir, candidate_filename)
-                new_path = os.path.join(images_dir, new_filename)
+                old_path = os.path.join(assets.CANDIDATES_DIR, candidate_filename)
+                new_path = os.path.join(assets.IMAGES_DIR, new_filename)
                 
-                # Move file
-                import shutil
-                shutil.copy2(old_path, new_path)
+                # Move file, keeping the candidate if a later recipe was assigned it too
+                later_assignments = [payload.image_assignments.get(str(i)) for i in range(idx + 1, len(payload.recipes_data))]
+                assets.promote_candidate(old_path, new_path, keep_source=assigned_image in later_assignments)
                 
                 # Return relative path
                 final_image_path = f"images/recipes/{new_filename}"
                 recipe_dict["image_url"] = final_image_path
-                print(f"DEBUG: Moved candidate to: {final_image_path}")
-            except Exception as e:
-                print(f"ERROR: Failed to move candidate image: {e}")
+                background_tasks.add_task(jobs.submit, assets.generate_thumbnail, final_image_path)
+                logger.debug("Moved candidate to: %s", final_image_path)
+            except Exception:
+                logger.exception("Failed to move candidate image %s", assigned_image)
                 recipe_dict["image_url"] = None
         elif assigned_image:
             # Image is already in permanent storage
@@ -508,19 +653,22 @@ def finalize_multi_scrape(
             # No image assigned
             recipe_dict["image_url"] = None
         
-        # Create recipe in DB - convert dict to RecipeCreate
+        # Validate every recipe before inserting any of them
         try:
-            recipe_create = schemas.RecipeCreate(**recipe_dict)
-            new_recipe = crud.create_recipe(db, recipe=recipe_create)
-            created_recipes.append(new_recipe)
-            
-            # Start background templating for this recipe
-            background_tasks.add_task(background_generate_template, new_recipe.id)
+            recipe_creates.append(schemas.RecipeCreate(**recipe_dict))
         except Exception as e:
-            print(f"Error creating recipe {idx}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error creating recipe %s", idx)
             raise HTTPException(status_code=500, detail=f"Failed to create recipe: {str(e)}")
+
+    # One transaction (and one commit) for the whole batch
+    try:
+        created_recipes = crud.create_recipes(db, recipe_creates)
+    except Exception as e:
+        logger.exception("Error creating %d recipes", len(recipe_creates))
+        raise HTTPException(status_code=500, detail=f"Failed to create recipe: {str(e)}")
+
+    for new_recipe in created_recipes:
+        background_tasks.add_task(jobs.submit, background_generate_template, new_recipe.id)
     
     return {
         "status": "success",
@@ -529,44 +677,116 @@ def finalize_multi_scrape(
     }
 
 
+def _recipe_list_etag(db: Session, kind: str, skip: int, limit: int, allergens) -> tuple[str, int]:
+    """
+    Builds an ETag from the recipe table aggregates and the allergen definitions,
+    since has_allergens depends on both. Also returns the total row count for `kind`.
+    """
+    count, max_id, max_updated, favorite_count = crud.get_recipes_fingerprint(db)
+    total = favorite_count if kind == "favorites" else count
+    allergen_key = [(a.id, a.name, sorted(a.keywords or [])) for a in allergens]
+    raw = repr((kind, skip, limit, count, favorite_count, max_id, str(max_updated), cache.get_recipe_version(), allergen_key))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"', total
+
+def _pagination_headers(request: Request, skip: int, limit: int, total: int) -> dict:
+    """X-Total-Count plus RFC 8288 Link rels so clients can page without guessing."""
+    links = []
+    if limit > 0 and skip + limit < total:
+        links.append(f'<{request.url.include_query_params(skip=skip + limit, limit=limit)}>; rel="next"')
+    if skip > 0:
+        links.append(f'<{request.url.include_query_params(skip=max(skip - limit, 0), limit=limit)}>; rel="prev"')
+    headers = {"X-Total-Count": str(total)}
+    if links:
+        headers["Link"] = ", ".join(links)
+    return headers
+
+def _construct_list_item(recipe) -> schemas.RecipeListItem:
+    """
+    Builds the list DTO without re-validating; the ORM columns already have the
+    right types, so only serialization cost remains.
+    """
+    data = {name: getattr(recipe, name, None) for name in schemas.RecipeListItem.model_fields}
+    data["image_url_small"] = assets.get_thumbnail(recipe.image_url)
+    return schemas.RecipeListItem.model_construct(**data)
+
+def _recipe_list_response(request: Request, db: Session, kind: str, skip: int, limit: int, fetch):
+    """
+    Serves a recipe list page, answering 304 when the client's copy is current
+    and reusing the serialized body while the data is unchanged.
+    """
+    allergens = cache.get_cached_allergens(db)
+    etag, total = _recipe_list_etag(db, kind, skip, limit, allergens)
+    headers = {"ETag": etag, **_pagination_headers(request, skip, limit, total)}
 
-@router.get("/recipes", response_model=List[schemas.Recipe])
-def read_recipes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    recipes = crud.get_recipes(db, skip=skip, limit=limit)
-    
-    # Get all allergens once for efficiency
-    allergens = crud.get_allergens(db)
-    
-    # Add has_allergens to each recipe using translation-based checking
-    for recipe in recipes:
-        recipe.has_allergens = allergen_checker.check_recipe_allergens(recipe, allergens)
-    
-    return recipes
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
 
-@router.get("/recipes/favorites", response_model=List[schemas.Recipe])
-def read_favorite_recipes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    recipes = crud.get_favorite_recipes(db, skip=skip, limit=limit)
-    
-    # Get all allergens once for efficiency
-    allergens = crud.get_allergens(db)
-    
-    # Add has_allergens to each recipe using translation-based checking
-    for recipe in recipes:
-        recipe.has_allergens = allergen_checker.check_recipe_allergens(recipe, allergens)
-    
-    return recipes
+    body = _recipe_list_bodies.get(etag)
+    if body is None:
+        recipes = fetch(db, skip=skip, limit=limit)
+
+        # Add has_allergens to each recipe (SQL prefilter + translation-based checking)
+        allergen_checker.annotate_recipes(db, recipes, allergens)
+
+        body = _recipe_list_adapter.dump_json([_construct_list_item(recipe) for recipe in recipes])
+        _recipe_list_bodies.set(etag, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/recipes", response_model=List[schemas.RecipeListItem])
+def read_recipes(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return _recipe_list_response(request, db, "all", skip, limit, crud.get_recipes)
+
+@router.get("/recipes/favorites", response_model=List[schemas.RecipeListItem])
+def read_favorite_recipes(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return _recipe_list_response(request, db, "favorites", skip, limit, crud.get_favorite_recipes)
+
+@router.get("/recipes/search", response_model=List[int])
+def search_recipes(q: str = "", db: Session = Depends(get_db)):
+    """
+    Ids of recipes whose title or ingredients mention `q`. List cards carry no
+    ingredients, so the dashboard asks here when the search box is used.
+    """
+    q = q.strip()
+    if not q:
+        return []
+    return crud.search_recipe_ids(db, q)
+
+def _recipe_detail_response(request: Request, body: bytes, etag: str) -> Response:
+    # no-cache: browsers may keep the body but must revalidate, so edits show up at once
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/recipes/{recipe_id}", response_model=schemas.Recipe)
-def read_recipe(recipe_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def read_recipe(recipe_id: int, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    # The DB fingerprint catches writes made by other workers; the in-process
+    # version also catches repeated writes within updated_at's one-second resolution
+    fingerprint = crud.get_recipe_fingerprint(db, recipe_id)
+    if fingerprint is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    cache_key = (recipe_id, fingerprint, cache.get_recipe_version())
+    cached = _recipe_bodies.get(cache_key)
+    if cached is not None:
+        return _recipe_detail_response(request, *cached)
+
     db_recipe = crud.get_recipe(db, recipe_id=recipe_id)
     if db_recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
     
     # Auto-generate template if missing when reading
     if db_recipe.instructions and not db_recipe.instruction_template:
-        background_tasks.add_task(background_generate_template, db_recipe.id)
-        
-    return db_recipe
+        background_tasks.add_task(jobs.submit, background_generate_template, db_recipe.id)
+        # Not cached: the template will change this recipe shortly
+        return db_recipe
+
+    body = schemas.Recipe.model_validate(db_recipe).model_dump_json().encode()
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    _recipe_bodies.set(cache_key, (body, etag))
+    return _recipe_detail_response(request, body, etag)
 
 @router.put("/recipes/{recipe_id}/favorite", response_model=schemas.Recipe)
 def set_recipe_favorite(recipe_id: int, is_favorite: bool, db: Session = Depends(get_db)):
@@ -576,19 +796,19 @@ def set_recipe_favorite(recipe_id: int, is_favorite: bool, db: Session = Depends
     return db_recipe
 
 @router.put("/recipes/{recipe_id}/scrape-ai", response_model=schemas.Recipe)
-def update_recipe_with_ai(recipe_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def update_recipe_with_ai(recipe_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Re-scrapes a recipe's source URL using the Groq API and updates the existing recipe.
     """
-    db_recipe = crud.get_recipe(db, recipe_id=recipe_id)
+    db_recipe = await run_in_threadpool(crud.get_recipe, db, recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    html = scraper.get_html(db_recipe.source_url)
+    html = await scraper.get_html_async(db_recipe.source_url)
     if not html:
         raise HTTPException(status_code=400, detail="Could not fetch HTML from the recipe's source URL.")
 
-    recipe_data = llm.extract_with_groq(html)
+    recipe_data = await run_in_threadpool(llm.extract_with_groq, html)
     if not recipe_data:
         raise HTTPException(status_code=500, detail="AI failed to extract recipe data.")
 
@@ -599,21 +819,22 @@ def update_recipe_with_ai(recipe_id: int, background_tasks: BackgroundTasks, db:
     # Reset template so it regenerates
     recipe_data["instruction_template"] = None
 
-    # Download image locally
     if recipe_data.get("image_url"):
         # Cleanup old image if it was local
         if db_recipe.image_url and not str(db_recipe.image_url).startswith("http"):
-            assets.delete_image(str(db_recipe.image_url))
-            
-        local_image = assets.download_image(str(recipe_data["image_url"]))
-        if local_image:
-            recipe_data["image_url"] = local_image
+            await run_in_threadpool(assets.delete_image, str(db_recipe.image_url))
 
     recipe_update = schemas.RecipeCreate(**recipe_data)
-    updated_recipe = crud.update_recipe(db, recipe_id=recipe_id, recipe=recipe_update)
+    updated_recipe = await run_in_threadpool(_update_recipe_out, db, recipe_id, recipe_update)
+    if not updated_recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    # Download the new image locally after responding
+    if updated_recipe.image_url and updated_recipe.image_url.startswith("http"):
+        background_tasks.add_task(jobs.submit, background_localize_image, updated_recipe.id, updated_recipe.image_url)
     
     # Start background templating
-    background_tasks.add_task(background_generate_template, updated_recipe.id)
+    background_tasks.add_task(jobs.submit, background_generate_template, updated_recipe.id)
     
     return updated_recipe
 
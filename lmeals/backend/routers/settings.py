@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
+import requests
+from requests.adapters import HTTPAdapter
 
+import cache
 import crud
 import schemas
-from database import SessionLocal
+from dependencies import get_db
 
 router = APIRouter()
 
-# Dependency to get the database session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+GROQ_MODELS_URL = "https://api.groq.com/openai/v1/models"
+
+# Key checks and model-list refreshes reuse one keep-alive connection to Groq
+_groq_session = requests.Session()
+_groq_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 @router.get("", response_model=List[schemas.Setting])
 def read_settings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
@@ -31,14 +32,13 @@ def verify_groq_key(setting: schemas.SettingCreate):
     Verifies the Groq API key by attempting to list models.
     This is more reliable than chat completions as it doesn't depend on a specific model name.
     """
-    import requests
     try:
         headers = {
             "Authorization": f"Bearer {setting.value}",
             "Content-Type": "application/json"
         }
         # Listing models is a standard way to check auth for OpenAI-compatible APIs
-        response = requests.get("https://api.groq.com/openai/v1/models", headers=headers)
+        response = _groq_session.get(GROQ_MODELS_URL, headers=headers, timeout=15)
         
         if response.status_code == 200:
             return {"status": "success", "message": "API Key is valid!"}
@@ -55,21 +55,23 @@ def get_groq_models(db: Session = Depends(get_db), api_key: str = None):
     Fetches available models from Groq API.
     If api_key is provided, uses it directly. Otherwise, fetches from database.
     """
-    import requests
-    
     # Use provided key or fetch from database
     if not api_key:
-        api_key_setting = crud.get_setting(db, key="GROQ_API_KEY")
-        if not api_key_setting or not api_key_setting.value:
+        api_key = cache.get_setting_value("GROQ_API_KEY", db)
+        if not api_key:
             raise HTTPException(status_code=400, detail="Groq API Key not set")
-        api_key = api_key_setting.value
+
+    cache_key = cache.content_key(api_key)
+    cached = cache.groq_models_cache.get(cache_key)
+    if cached is not None:
+        return {"status": "success", "models": list(cached)}
     
     try:
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
-        response = requests.get("https://api.groq.com/openai/v1/models", headers=headers)
+        response = _groq_session.get(GROQ_MODELS_URL, headers=headers, timeout=15)
         if response.status_code == 200:
             models_data = response.json()
             # Filter for text-to-text models (exclude whisper, etc.)
@@ -77,6 +79,7 @@ def get_groq_models(db: Session = Depends(get_db), api_key: str = None):
                 m["id"] for m in models_data.get("data", [])
                 if "whisper" not in m["id"].lower() and "vision" not in m["id"].lower()
             ]
+            cache.groq_models_cache.set(cache_key, tuple(text_models))
             return {"status": "success", "models": text_models}
         else:
              raise HTTPException(status_code=response.status_code, detail="Failed to fetch models from Groq")
@@ -85,7 +88,7 @@ def get_groq_models(db: Session = Depends(get_db), api_key: str = None):
 
 @router.get("/{key}", response_model=schemas.Setting)
 def read_setting(key: str, db: Session = Depends(get_db)):
-    db_setting = crud.get_setting(db, key=key)
-    if db_setting is None:
+    value = cache.get_setting_value(key, db)
+    if value is None:
         raise HTTPException(status_code=404, detail="Setting not found")
-    return db_setting
+    return {"key": key, "value": value}
@@ -5,24 +5,17 @@ from datetime import date
 
 import crud
 import schemas
-from database import SessionLocal
+from dependencies import get_db
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/shopping-list", response_model=List[str])
 def get_shopping_list(start_date: date, end_date: date, db: Session = Depends(get_db)):
     """
     Generates a shopping list by aggregating unique ingredients from all recipes
     within the specified date range in the meal plan.
     """
-    entries = crud.get_meal_plan_entries(db, start_date=str(start_date), end_date=str(end_date))
+    entries = crud.get_meal_plan_entries(db, start_date=start_date, end_date=end_date)
 
     # Using a set to store unique ingredient texts
     unique_ingredients = set()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -13,8 +13,7 @@ class Ingredient(IngredientBase):
     id: int
     recipe_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Recipe Schemas
 class RecipeBase(BaseModel):
@@ -42,8 +41,27 @@ class Recipe(RecipeBase):
     ingredients: List[Ingredient] = []
     has_allergens: Optional[bool] = None  # Computed field, not in DB
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class RecipeListItem(BaseModel):
+    """
+    Recipe card for list endpoints; the full recipe comes from /recipes/{id}.
+    """
+    id: int
+    title: str
+    prep_time: Optional[str] = None
+    cook_time: Optional[str] = None
+    active_time: Optional[str] = None
+    total_time: Optional[str] = None
+    servings: Optional[str] = None
+    yield_unit: Optional[str] = "servings"
+    image_url: Optional[str] = None
+    image_url_small: Optional[str] = None  # 320px WebP card variant, when generated
+    is_favorite: bool = False
+    created_at: datetime
+    has_allergens: Optional[bool] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 # Allergen Schemas
 class AllergenBase(BaseModel):
@@ -56,8 +74,7 @@ class Allergen(AllergenBase):
     id: int
     keywords: List[str] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Scraping Schemas
 class ScrapeRequest(BaseModel):
@@ -110,8 +127,7 @@ class MealPlanEntry(MealPlanEntryBase):
     id: int
     recipe: Recipe
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Setting Schemas
 class SettingBase(BaseModel):
@@ -122,5 +138,4 @@ class SettingCreate(SettingBase):
     pass
 
 class Setting(SettingBase):
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
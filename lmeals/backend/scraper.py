@@ -1,16 +1,58 @@
 from recipe_scrapers import scrape_me
 from recipe_scrapers._exceptions import WebsiteNotImplementedError
+from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import httpx
+import logging
+import multiprocessing
+import os
+import re
 import requests
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import cache
 
-def scrape_with_library(url: str):
+logger = logging.getLogger("lmeals.scraper")
+
+# recipe-scrapers hard-codes BeautifulSoup's pure-Python "html.parser" for every
+# page. lxml (already a dependency) builds the same soup several times faster.
+def _lxml_soup(markup="", features=None, *args, **kwargs):
+    if features == "html.parser":
+        features = "lxml"
+    return BeautifulSoup(markup, features, *args, **kwargs)
+
+def _use_lxml_in_recipe_scrapers() -> bool:
+    """
+    Swaps lxml into recipe-scrapers' page parsing. This patches a private
+    module, so it is only done when the layout matches the pinned version;
+    otherwise the library keeps its own parser and a warning is logged.
+    """
+    try:
+        from recipe_scrapers import _abstract
+    except ImportError:
+        _abstract = None
+    if getattr(_abstract, "BeautifulSoup", None) not in (BeautifulSoup, _lxml_soup):
+        logger.warning("recipe_scrapers._abstract.BeautifulSoup not found; scraping with the library's default parser")
+        return False
+    _abstract.BeautifulSoup = _lxml_soup
+    return True
+
+_use_lxml_in_recipe_scrapers()
+
+def scrape_with_library(url: str, html: str | None = None):
     """
     Scrapes a recipe from a URL using the recipe-scrapers library.
-    Fetches HTML first with a browser-like User-Agent to avoid bot detection.
+    Fetches HTML first with a browser-like User-Agent to avoid bot detection,
+    unless the caller already fetched it (e.g. via get_html_async).
     Strictly uses official support only (Standard Mode).
     """
-    print(f"DEBUG: Attempting to scrape URL with library: {url}")
+    logger.debug("Attempting to scrape URL with library: %s", url)
     
-    html = get_html(url)
+    if html is None:
+        html = get_html(url)
     if not html:
         return None
 
@@ -26,15 +68,16 @@ def scrape_with_library(url: str):
         # Extract fields safely
         try:
             ingredients = scraper.ingredients()
-            instructions = scraper.instructions()
+            # instructions_list() is built from instructions(); one call covers both uses
+            instructions = scraper.instructions_list()
             title = scraper.title()
         except Exception as e:
-            print(f"DEBUG: Error extracting essential fields from {url}: {e}")
+            logger.debug("Error extracting essential fields from %s: %s", url, e)
             return None
 
         # Check for essential fields
         if not ingredients or not instructions:
-            print(f"DEBUG: Missing ingredients or instructions for {url}")
+            logger.debug("Missing ingredients or instructions for %s", url)
             return None
             
         # Get image and yield, handle empty strings for HttpUrl validation
@@ -42,58 +85,182 @@ def scrape_with_library(url: str):
         if not image_url or not image_url.strip():
             image_url = None
 
+        # Each accessor re-walks the parsed document, so call each one once
+        prep_time = scraper.prep_time()
+        cook_time = scraper.cook_time()
+        yields = scraper.yields()
+
         return {
             "title": title,
-            "instructions": scraper.instructions_list(),
-            "prep_time": str(scraper.prep_time()) if scraper.prep_time() is not None else None,
-            "cook_time": str(scraper.cook_time()) if scraper.cook_time() is not None else None,
-            "servings": str(scraper.yields()) if scraper.yields() is not None else None,
+            "instructions": instructions,
+            "prep_time": str(prep_time) if prep_time is not None else None,
+            "cook_time": str(cook_time) if cook_time is not None else None,
+            "servings": str(yields) if yields is not None else None,
             "image_url": image_url,
             "ingredients": [{"text": i} for i in ingredients],
             "source_url": url
         }
     except WebsiteNotImplementedError:
-        print(f"DEBUG: Website not officially supported by library: {url}")
+        logger.debug("Website not officially supported by library: %s", url)
         return None
     except Exception as e:
-        print(f"DEBUG: Unexpected scraping error for {url}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected scraping error for %s", url)
         return None
 
+# recipe-scrapers parsing (BeautifulSoup + JSON-LD) is pure CPU work; running it
+# in worker processes keeps it from holding the server's GIL. 0 parses in a thread.
+PARSE_WORKERS = int(os.getenv("LMEALS_PARSE_WORKERS", "2"))
+
+_parse_pool: ProcessPoolExecutor | None = None
+_parse_pool_lock = threading.Lock()
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # spawn, not fork: the server process already runs threads
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+def shutdown_parse_pool():
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=False, cancel_futures=True)
+            _parse_pool = None
+
+async def scrape_html_async(url: str, html: str):
+    """
+    Runs scrape_with_library on already-fetched HTML in the parse pool.
+    Falls back to a thread if the pool is disabled or a worker died.
+    """
+    if PARSE_WORKERS > 0:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_get_parse_pool(), scrape_with_library, url, html)
+        except BrokenProcessPool:
+            logger.warning("Parse pool broke while scraping %s, retrying in a thread", url)
+            shutdown_parse_pool()
+    return await asyncio.to_thread(scrape_with_library, url, html)
+
 def get_html(url: str):
     """
     Fetches the raw HTML content of a URL using a browser-like User-Agent.
     Handles Google Docs by exporting to text format.
+    Successful fetches are cached per URL for a day.
     """
+    url_key = cache.content_key(url)
+    cached = cache.html_cache.get(url_key)
+    if cached is not None:
+        return cached
+
+    html = _fetch_html(url)
+    if html:
+        cache.html_cache.set(url_key, html)
+    return html
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Sync fetches (threadpool callers, video link scraping) share one session so
+# repeat scrapes of a site reuse its connection; transient errors get two retries
+_session = requests.Session()
+_session.headers.update(BROWSER_HEADERS)
+_session.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+_GOOGLE_DOC_ID = re.compile(r'document/d/([a-zA-Z0-9-_]+)')
+
+def _google_doc_export_url(url: str):
+    """Returns the plain-text export URL for a Google Doc link, else None."""
+    if "docs.google.com/document/d/" not in url:
+        return None
+    match = _GOOGLE_DOC_ID.search(url)
+    if not match:
+        return None
+    return f"https://docs.google.com/document/d/{match.group(1)}/export?format=txt"
+
+def _fetch_html(url: str):
     # Special handling for Google Docs
-    if "docs.google.com/document/d/" in url:
+    export_url = _google_doc_export_url(url)
+    if export_url:
         try:
-            import re
-            # Extract Doc ID
-            match = re.search(r'document/d/([a-zA-Z0-9-_]+)', url)
-            if match:
-                doc_id = match.group(1)
-                export_url = f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
-                print(f"DEBUG: Detected Google Doc. Fetching text export from: {export_url}")
-                
-                response = requests.get(export_url, timeout=15)
-                response.raise_for_status()
-                return response.text
+            logger.debug("Detected Google Doc. Fetching text export from: %s", export_url)
+            response = _session.get(export_url, timeout=15)
+            response.raise_for_status()
+            return response.text
         except Exception as e:
-            print(f"Error fetching Google Doc export: {e}")
+            logger.warning("Error fetching Google Doc export: %s", e)
             # Fall through to normal fetch if export fails
             pass
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-    }
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = _session.get(url, timeout=15)
         response.raise_for_status()
         return response.text
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching HTML for {url}: {e}")
+        logger.warning("Error fetching HTML for %s: %s", url, e)
+        return None
+
+# Shared async client so concurrent scrapes reuse connections without tying up
+# worker threads. Closed by the app lifespan on shutdown.
+_async_client: httpx.AsyncClient | None = None
+
+def get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers=BROWSER_HEADERS,
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _async_client
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+async def get_html_async(url: str):
+    """
+    Async counterpart of get_html for async route handlers. Shares its cache.
+    """
+    url_key = cache.content_key(url)
+    cached = cache.html_cache.get(url_key)
+    if cached is not None:
+        return cached
+
+    html = await _fetch_html_async(url)
+    if html:
+        cache.html_cache.set(url_key, html)
+    return html
+
+async def _fetch_html_async(url: str):
+    client = get_async_client()
+
+    export_url = _google_doc_export_url(url)
+    if export_url:
+        try:
+            logger.debug("Detected Google Doc. Fetching text export from: %s", export_url)
+            response = await client.get(export_url)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            logger.warning("Error fetching Google Doc export: %s", e)
+
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        return response.text
+    except httpx.HTTPError as e:
+        logger.warning("Error fetching HTML for %s: %s", url, e)
         return None
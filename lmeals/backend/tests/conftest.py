@@ -0,0 +1,49 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite database that is
+recreated for every test, with the in-process caches emptied alongside it.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# database.py reads DATABASE_URL at import time, so this has to come first
+_DB_DIR = tempfile.mkdtemp(prefix="lmeals-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+# Any lazy load while serving a request fails the test (N+1 regressions)
+os.environ["LMEALS_LAZY_LOADS"] = "raise"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+import models  # noqa: E402,F401  (registers the tables on Base)
+import translator  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from routers import recipes as recipes_router  # noqa: E402
+
+def _reset_caches():
+    for value in [*vars(cache).values(), *vars(recipes_router).values()]:
+        if isinstance(value, cache.TTLCache):
+            value.clear()
+    cache.bump_allergen_version()
+    translator._translate_cached.cache_clear()
+    translator._normalize_cached.cache_clear()
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _reset_caches()
+    yield
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def client():
+    # No context manager: the lifespan shuts the shared job pool down on exit
+    from fastapi.testclient import TestClient
+    import main
+    return TestClient(main.app)
@@ -0,0 +1,35 @@
+"""
+Allergen creation is a single INSERT ... ON CONFLICT DO NOTHING; a duplicate
+name must come back as a 400 without touching the existing row.
+"""
+import pytest
+
+import cache
+import jobs
+import models
+
+@pytest.fixture(autouse=True)
+def no_keyword_expansion(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(jobs, "submit", lambda fn, *args: submitted.append(args))
+    return submitted
+
+def test_create_allergen(client, no_keyword_expansion):
+    before = cache.get_allergen_version()
+    response = client.post("/api/allergens", json={"name": "Peanut"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "Peanut" and body["keywords"] == ["peanut"]
+    assert cache.get_allergen_version() != before
+    assert no_keyword_expansion == [(body["id"], "Peanut")]
+
+def test_duplicate_allergen_is_400(client, db, no_keyword_expansion):
+    first = client.post("/api/allergens", json={"name": "Peanut"}).json()
+    db.query(models.Allergen).filter_by(id=first["id"]).update({"keywords": ["peanut", "groundnut"]})
+    db.commit()
+
+    response = client.post("/api/allergens", json={"name": "Peanut"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Allergen already exists"
+    assert [(a.name, a.keywords) for a in db.query(models.Allergen)] == [("Peanut", ["peanut", "groundnut"])]
+    assert len(no_keyword_expansion) == 1
@@ -0,0 +1,133 @@
+"""
+Allergen detection: the SQL prefilter decides whether the per-ingredient
+check runs at all, so it must never drop a recipe the full check would flag.
+"""
+import pytest
+
+import allergen_checker
+import crud
+import models
+import translator
+
+# Stands in for Google Translate so the tests stay offline
+_TRANSLATIONS = {
+    "כוסות חלב": "cups of milk",
+    "חלב": "milk",
+    "ביצים": "eggs",
+    "מלח": "salt",
+    "שמן זית": "olive oil",
+    "גרם חמאה": "grams of butter",
+}
+
+class FakeTranslator:
+    calls = []
+    failing = False
+
+    def __init__(self, source, target):
+        pass
+
+    def translate(self, text):
+        FakeTranslator.calls.append(text)
+        if FakeTranslator.failing:
+            raise ConnectionError("translate.google.com unreachable")
+        return _TRANSLATIONS.get(text, text)
+
+@pytest.fixture(autouse=True)
+def offline_translation(monkeypatch):
+    FakeTranslator.calls = []
+    FakeTranslator.failing = False
+    monkeypatch.setattr(translator, "GoogleTranslator", FakeTranslator)
+
+# Ingredient lists mixing English, Hebrew and accented text, with the verdict
+# the full per-ingredient check is expected to reach
+RECIPES = [
+    (["2 cups Milk", "1 tsp salt"], True),
+    (["1 cup peanut butter"], False),
+    (["2 כוסות חלב", "1 cup flour"], True),
+    (["מלח", "שמן זית"], False),
+    (["200 ml crème fraîche"], True),
+    (["Crème Fraîche, to serve"], True),
+    # Only reachable through the non-ASCII fallback: SQLite's lower() leaves
+    # È alone, and no keyword is spelled in Hebrew as חמאה
+    (["CRÈME FRAÎCHE"], True),
+    (["100 גרם חמאה"], True),
+    (["3 EGGS, beaten"], True),
+    (["4 ביצים"], True),
+    (["1/2 cup Sour Cream"], True),
+    (["Buttermilk"], False),
+    (["Lait entier"], False),
+    (["water"], False),
+    ([], False),
+]
+
+def _seed(db):
+    allergens = [
+        models.Allergen(name="Milk", keywords=["milk", "butter", "sour cream", "crème fraîche", "חלב"]),
+        models.Allergen(name="Egg", keywords=["egg", "eggs", "ביצים"]),
+    ]
+    db.add_all(allergens)
+    recipes = []
+    for idx, (ingredients, _) in enumerate(RECIPES):
+        recipe = models.Recipe(title=f"recipe {idx}", source_url="http://example.com", instructions=["mix"])
+        recipe.ingredients = [models.Ingredient(text=text) for text in ingredients]
+        recipes.append(recipe)
+    db.add_all(recipes)
+    db.commit()
+    return recipes, allergens
+
+def test_annotate_recipes_reaches_expected_verdicts(db):
+    recipes, allergens = _seed(db)
+    allergen_checker.annotate_recipes(db, recipes, allergens)
+    assert [recipe.has_allergens for recipe in recipes] == [expected for _, expected in RECIPES]
+
+def test_prefilter_keeps_every_flagged_recipe(db):
+    recipes, allergens = _seed(db)
+    candidates = crud.get_allergen_candidate_recipe_ids(
+        db, [recipe.id for recipe in recipes], allergen_checker.collect_keywords(allergens)
+    )
+    flagged = {recipe.id for recipe, (_, expected) in zip(recipes, RECIPES) if expected}
+    assert flagged <= candidates
+    # Plain English recipes without a keyword are ruled out in SQL
+    assert recipes[-2].id not in candidates
+
+def test_pure_ascii_text_is_never_translated():
+    # The SQL prefilter matches ASCII ingredient text literally, which is only
+    # sound while translation leaves it alone
+    assert translator.translate_to_english("Lait Entier") == "lait entier"
+    assert translator.normalize_ingredient("2 cups Leche") == ("2 cups leche", "leche")
+    assert FakeTranslator.calls == []
+
+def test_failed_translation_is_retried_not_memoised():
+    FakeTranslator.failing = True
+    assert translator.normalize_ingredient("2 כוסות חלב") == ("2 כוסות חלב", "כוסות חלב")
+    assert not translator.ingredient_contains_allergen("2 כוסות חלב", ("milk",))
+
+    # Once Google answers again the same text is translated, not served the fallback
+    FakeTranslator.failing = False
+    assert translator.normalize_ingredient("2 כוסות חלב")[-1] == "cups of milk"
+    assert translator.ingredient_contains_allergen("2 כוסות חלב", ("milk",))
+    # Both failures went back to Google; the success was memoised
+    assert FakeTranslator.calls == ["כוסות חלב"] * 3
+
+def test_translations_are_persisted_across_the_memory_caches():
+    assert translator.translate_to_english("חלב") == "milk"
+    assert FakeTranslator.calls == ["חלב"]
+
+    # A restart empties the in-process caches; the llm_cache row still answers
+    translator._translate_cached.cache_clear()
+    translator._normalize_cached.cache_clear()
+    assert translator.normalize_ingredient("חלב") == ("חלב", "milk")
+    assert FakeTranslator.calls == ["חלב"]
+
+def test_prefilter_handles_thousands_of_keywords(client, db):
+    recipes, _ = _seed(db)
+    # Expanded keyword lists can run past SQLite's expression depth limit of 1000
+    db.add(models.Allergen(name="Spices", keywords=[f"spice{n} blend" for n in range(1500)] + ["salt"]))
+    db.commit()
+
+    response = client.get("/api/recipes")
+    assert response.status_code == 200
+    flagged = {recipe["id"] for recipe in response.json() if recipe["has_allergens"]}
+    expected = {recipe.id for recipe, (_, has_allergen) in zip(recipes, RECIPES) if has_allergen}
+    # מלח translates to "salt"
+    assert flagged == expected | {recipes[3].id}
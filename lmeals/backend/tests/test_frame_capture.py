@@ -0,0 +1,38 @@
+"""
+Single-pass frame capture: output files must be matched to the timestamps
+they were selected for, not to their position in ffmpeg's output.
+"""
+import os
+import subprocess
+import types
+
+import audio_processor
+
+def _fake_ffmpeg(frame_times):
+    """Writes one file per selected frame and logs showinfo lines like ffmpeg does."""
+    def run(cmd, **kwargs):
+        pattern = cmd[-1]
+        lines = ["[Parsed_showinfo_1 @ 0x5555] config in time_base: 1/12800, frame_rate: 30/1"]
+        for number, pts in enumerate(frame_times, start=1):
+            with open(pattern % number, "w") as f:
+                f.write(str(pts))
+            lines.append(f"[Parsed_showinfo_1 @ 0x5555] n:{number - 1:4d} pts:{int(pts * 12800):7d} pts_time:{pts:<8} duration:512")
+        return types.SimpleNamespace(returncode=0, stderr="\n".join(lines))
+    return run
+
+def test_frames_are_matched_by_pts(tmp_path, monkeypatch):
+    # 0.5s and 1s select the same frame; 12s is past the end of the clip
+    monkeypatch.setattr(subprocess, "run", _fake_ffmpeg([1.0, 5.04]))
+    outputs = [(ts, str(tmp_path / f"frame_{ts:g}s.jpg")) for ts in (0.5, 1.0, 5.0, 12.0)]
+
+    written = audio_processor._extract_frames_single_pass("clip.mp4", outputs)
+
+    assert written == [True, False, True, False]
+    assert sorted(os.listdir(tmp_path)) == ["frame_0.5s.jpg", "frame_5s.jpg"]
+    assert (tmp_path / "frame_5s.jpg").read_text() == "5.04"
+
+def test_no_showinfo_output_means_nothing_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: types.SimpleNamespace(returncode=1, stderr="Unknown filter"))
+    outputs = [(1.0, str(tmp_path / "frame_1s.jpg"))]
+    assert audio_processor._extract_frames_single_pass("clip.mp4", outputs) == [False]
+    assert os.listdir(tmp_path) == []
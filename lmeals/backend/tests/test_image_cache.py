@@ -0,0 +1,109 @@
+"""
+Downloaded images are cached by URL hash: fresh entries skip the network,
+stale ones are revalidated, and the cache is kept under its size budget.
+"""
+import os
+import time
+
+import pytest
+import requests
+
+import assets
+
+URL = "https://cdn.example.com/cover.jpg"
+
+class FakeResponse:
+    def __init__(self, status_code, body=b""):
+        self.status_code = status_code
+        self.headers = {"content-type": "image/jpeg"}
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@pytest.fixture
+def image_dirs(tmp_path, monkeypatch):
+    for name in ("IMAGES_DIR", "IMAGE_CACHE_DIR"):
+        path = tmp_path / name
+        path.mkdir()
+        monkeypatch.setattr(assets, name, str(path))
+    monkeypatch.setattr(assets, "generate_thumbnail", lambda relative_path: None)
+    return tmp_path
+
+@pytest.fixture
+def remote(monkeypatch):
+    requests_seen = []
+    replies = []
+
+    def get(url, headers=None, **kwargs):
+        requests_seen.append(headers or {})
+        return replies.pop(0)
+
+    monkeypatch.setattr(assets._image_session, "get", get)
+    return requests_seen, replies
+
+def _published(relative_path):
+    with open(os.path.join(assets.IMAGES_DIR, os.path.basename(relative_path)), "rb") as f:
+        return f.read()
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+def test_fresh_entry_skips_the_download(image_dirs, remote):
+    seen, replies = remote
+    replies.append(FakeResponse(200, b"v1"))
+    first = assets.download_image(URL)
+    second = assets.download_image(URL)
+    assert len(seen) == 1
+    assert first != second and _published(second) == b"v1"
+
+def test_stale_entry_is_revalidated(image_dirs, remote):
+    seen, replies = remote
+    replies.append(FakeResponse(200, b"v1"))
+    assets.download_image(URL)
+    cached = assets._cached_image_path(URL)
+
+    _age(cached, assets.IMAGE_CACHE_TTL_SECONDS + 60)
+    replies.append(FakeResponse(304))
+    assert _published(assets.download_image(URL)) == b"v1"
+    assert "If-Modified-Since" in seen[-1]
+    assert time.time() - os.path.getmtime(cached) < 60
+
+    _age(cached, assets.IMAGE_CACHE_TTL_SECONDS + 60)
+    replies.append(FakeResponse(200, b"v2"))
+    assert _published(assets.download_image(URL)) == b"v2"
+
+def test_stale_entry_is_used_when_the_remote_is_down(image_dirs, remote, monkeypatch):
+    _, replies = remote
+    replies.append(FakeResponse(200, b"v1"))
+    assets.download_image(URL)
+    _age(assets._cached_image_path(URL), assets.IMAGE_CACHE_TTL_SECONDS + 60)
+
+    def down(url, **kwargs):
+        raise requests.ConnectionError("offline")
+    monkeypatch.setattr(assets._image_session, "get", down)
+    assert _published(assets.download_image(URL)) == b"v1"
+
+def test_prune_drops_least_recently_used_entries(image_dirs):
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = os.path.join(assets.IMAGE_CACHE_DIR, f"{name}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"x" * 100)
+        _age(path, age * 60)
+
+    assets.prune_image_cache(max_bytes=150)
+    assert os.listdir(assets.IMAGE_CACHE_DIR) == ["newest.jpg"]
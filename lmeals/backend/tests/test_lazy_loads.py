@@ -0,0 +1,34 @@
+"""
+The suite runs with LMEALS_LAZY_LOADS=raise (see conftest), so these fail if
+a list route starts loading relationships one row at a time.
+"""
+from datetime import date
+
+import models
+
+def _seed(db, count=3):
+    recipes = []
+    for n in range(count):
+        recipe = models.Recipe(title=f"Recipe {n}", source_url="http://example.com", instructions=["mix"],
+                               instruction_template=["mix"], is_favorite=n % 2 == 0)
+        recipe.ingredients = [models.Ingredient(text="2 eggs"), models.Ingredient(text="1 cup milk")]
+        recipes.append(recipe)
+    db.add_all(recipes)
+    db.add(models.Allergen(name="Egg", keywords=["egg", "eggs"]))
+    db.flush()
+    db.add_all(models.MealPlanEntry(date=date(2026, 10, 19 + n), recipe_id=recipe.id) for n, recipe in enumerate(recipes))
+    db.commit()
+
+def test_recipe_lists_load_eagerly(client, db):
+    _seed(db)
+    recipes = client.get("/api/recipes")
+    assert recipes.status_code == 200
+    assert all(recipe["has_allergens"] for recipe in recipes.json())
+    favorites = client.get("/api/recipes/favorites")
+    assert [recipe["title"] for recipe in favorites.json()] == ["Recipe 0", "Recipe 2"]
+
+def test_meal_plan_loads_eagerly(client, db):
+    _seed(db)
+    response = client.get("/api/meal-plan?start_date=2026-10-19&end_date=2026-10-25")
+    assert response.status_code == 200
+    assert [len(entry["recipe"]["ingredients"]) for entry in response.json()] == [2, 2, 2]
@@ -0,0 +1,45 @@
+"""
+Bulk meal plan writes: every entry lands in one transaction, or none do.
+"""
+import crud
+import models
+import schemas
+
+def _add_recipe(db, title):
+    recipe = models.Recipe(title=title, source_url="http://example.com", instructions=["mix"])
+    recipe.ingredients = [models.Ingredient(text="2 eggs")]
+    db.add(recipe)
+    db.commit()
+    return recipe.id
+
+def test_bulk_insert_returns_entries_with_recipes(client, db):
+    first, second = _add_recipe(db, "Pancakes"), _add_recipe(db, "Waffles")
+    response = client.post("/api/meal-plan/bulk", json=[
+        {"date": "2026-10-19", "recipe_id": first},
+        {"date": "2026-10-20", "recipe_id": second, "meal_type": "Lunch"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [(e["date"], e["meal_type"], e["recipe"]["title"]) for e in body] == [
+        ("2026-10-19", "Dinner", "Pancakes"),
+        ("2026-10-20", "Lunch", "Waffles"),
+    ]
+    assert body[0]["recipe"]["ingredients"][0]["text"] == "2 eggs"
+
+def test_bulk_insert_spans_batches(db):
+    recipe_id = _add_recipe(db, "Pancakes")
+    entries = [{"date": f"2026-10-{day:02d}", "recipe_id": recipe_id} for day in range(1, 8)]
+    created = crud.create_meal_plan_entries(db, [schemas.MealPlanEntryCreate(**e) for e in entries], batch_size=3)
+    assert [str(e.date) for e in created] == [e["date"] for e in entries]
+
+def test_unknown_recipe_rejects_the_whole_batch(client, db):
+    recipe_id = _add_recipe(db, "Pancakes")
+    response = client.post("/api/meal-plan/bulk", json=[
+        {"date": "2026-10-19", "recipe_id": recipe_id},
+        {"date": "2026-10-20", "recipe_id": 999},
+    ])
+    assert response.status_code == 404
+    assert db.query(models.MealPlanEntry).count() == 0
+
+def test_empty_batch_is_a_no_op(client):
+    assert client.post("/api/meal-plan/bulk", json=[]).json() == []
@@ -0,0 +1,101 @@
+"""
+Recipe response caching: cached bodies must never outlive the rows they
+were built from, whichever process or statement wrote them.
+"""
+import subprocess
+import types
+
+from sqlalchemy import update
+
+import assets
+import cache
+import crud
+import models
+from database import engine
+
+def _add_recipe(db, title="Pancakes", ingredients=("2 eggs", "1 cup flour"), **fields):
+    fields.setdefault("instruction_template", ["mix"])
+    recipe = models.Recipe(title=title, source_url="http://example.com", instructions=["mix"], **fields)
+    recipe.ingredients = [models.Ingredient(text=text) for text in ingredients]
+    db.add(recipe)
+    db.commit()
+    return recipe.id
+
+def test_detail_cache_sees_writes_from_other_workers(client, db):
+    recipe_id = _add_recipe(db)
+    first = client.get(f"/api/recipes/{recipe_id}")
+    assert first.json()["title"] == "Pancakes"
+
+    # Another worker's write: no ORM events and no version bump in this process
+    with engine.begin() as conn:
+        conn.execute(update(models.Recipe.__table__).where(models.Recipe.id == recipe_id).values(title="Waffles"))
+
+    second = client.get(f"/api/recipes/{recipe_id}")
+    assert second.json()["title"] == "Waffles"
+    assert second.headers["etag"] != first.headers["etag"]
+
+def test_set_instruction_template_invalidates_cached_bodies(db):
+    recipe_id = _add_recipe(db, instruction_template=None)
+    before = cache.get_recipe_version()
+    assert crud.set_instruction_template(db, recipe_id, ["[[qty:2]] eggs"])
+    assert cache.get_recipe_version() > before
+
+def test_missing_recipe_is_404(client):
+    assert client.get("/api/recipes/999").status_code == 404
+
+def test_detail_answers_304_for_current_etag(client, db):
+    recipe_id = _add_recipe(db)
+    first = client.get(f"/api/recipes/{recipe_id}")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    assert client.get(f"/api/recipes/{recipe_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/recipes/{recipe_id}", headers={"If-None-Match": f'"stale", W/{etag}'}).status_code == 304
+
+    client.put(f"/api/recipes/{recipe_id}/favorite?is_favorite=true")
+    refreshed = client.get(f"/api/recipes/{recipe_id}", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["is_favorite"] is True
+
+def test_list_etag_changes_with_the_data(client, db):
+    _add_recipe(db, title="Pancakes")
+    first = client.get("/api/recipes")
+    etag = first.headers["etag"]
+    assert first.headers["x-total-count"] == "1"
+    assert "ingredients" not in first.json()[0]
+    assert client.get("/api/recipes", headers={"If-None-Match": etag}).status_code == 304
+
+    _add_recipe(db, title="Waffles")
+    second = client.get("/api/recipes", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert [recipe["title"] for recipe in second.json()] == ["Pancakes", "Waffles"]
+
+def test_list_etag_changes_when_allergens_change(client, db):
+    _add_recipe(db)
+    first = client.get("/api/recipes")
+    assert first.json()[0]["has_allergens"] is False
+
+    db.add(models.Allergen(name="Egg", keywords=["egg", "eggs"]))
+    db.commit()
+    cache.bump_allergen_version()
+
+    second = client.get("/api/recipes", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()[0]["has_allergens"] is True
+
+def test_list_etag_changes_when_a_thumbnail_appears(client, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "THUMBS_DIR", str(tmp_path))
+    _add_recipe(db, image_url="images/recipes/pancakes.jpg")
+    first = client.get("/api/recipes")
+    assert first.json()[0]["image_url_small"] is None
+
+    # The thumbnail is written by a background job after the recipe is saved
+    def fake_ffmpeg(cmd, **kwargs):
+        open(cmd[-1], "wb").close()
+        return types.SimpleNamespace(returncode=0, stderr="")
+    monkeypatch.setattr(subprocess, "run", fake_ffmpeg)
+    assert assets.generate_thumbnail("images/recipes/pancakes.jpg")
+
+    second = client.get("/api/recipes", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()[0]["image_url_small"] == "images/recipes/thumbs/pancakes.webp"
@@ -0,0 +1,20 @@
+"""
+recipe-scrapers parses pages with lxml through a patch of a private module;
+a library upgrade that moves it must degrade to the default parser, not break.
+"""
+from recipe_scrapers import _abstract, scrape_html
+
+import scraper
+
+PAGE = "<html lang='en'><head><title>Pancakes</title></head><body><h1>Pancakes</h1></body></html>"
+
+def test_recipe_scrapers_parses_with_lxml():
+    assert scraper._use_lxml_in_recipe_scrapers()
+    page = scrape_html(PAGE, org_url="https://www.allrecipes.com/recipe/1/pancakes/")
+    assert page.soup.builder.NAME == "lxml"
+
+def test_missing_private_attribute_only_warns(monkeypatch, caplog):
+    monkeypatch.delattr(_abstract, "BeautifulSoup")
+    assert not scraper._use_lxml_in_recipe_scrapers()
+    assert not hasattr(_abstract, "BeautifulSoup")
+    assert "default parser" in caplog.text
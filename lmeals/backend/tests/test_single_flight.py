@@ -0,0 +1,51 @@
+"""
+Single-flight scraping: concurrent requests for one URL share a single
+extraction, and a caller that disconnects must not take the others down.
+"""
+import asyncio
+
+from routers import recipes as recipes_router
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    async def extract(url):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return {"title": "Pancakes"}
+
+    async def scenario():
+        return await asyncio.gather(*(
+            recipes_router._single_flight(("ai", "http://x"), extract, "http://x") for _ in range(3)
+        ))
+
+    results = asyncio.run(scenario())
+    assert calls == ["http://x"]
+    assert [owner for _, owner in results] == [True, False, False]
+    assert all(result == {"title": "Pancakes"} for result, _ in results)
+    # Every caller gets its own copy to mutate
+    assert len({id(result) for result, _ in results}) == 3
+    assert recipes_router._scrapes_in_flight == {}
+
+def test_waiter_takes_over_when_owner_is_cancelled():
+    calls = []
+
+    async def extract(url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return {"title": "Pancakes"}
+
+    async def scenario():
+        owner = asyncio.create_task(recipes_router._single_flight(("ai", "http://x"), extract, "http://x"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(recipes_router._single_flight(("ai", "http://x"), extract, "http://x"))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        result = await waiter
+        return owner, result
+
+    owner, (result, ran_it) = asyncio.run(scenario())
+    assert owner.cancelled()
+    assert result == {"title": "Pancakes"} and ran_it
+    assert calls == ["http://x", "http://x"]
+    assert recipes_router._scrapes_in_flight == {}
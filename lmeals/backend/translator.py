@@ -2,10 +2,18 @@
 Translation utility for multilingual allergen detection.
 Uses deep-translator to translate ingredients to English for comparison.
 """
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
 from deep_translator import GoogleTranslator
 from functools import lru_cache
+import logging
 import re
 
+import cache
+import llm_cache
+
+logger = logging.getLogger("lmeals.translator")
+
 # Language code mapping
 LANGUAGE_CODES = {
     'he': 'hebrew',
@@ -17,7 +25,10 @@ LANGUAGE_CODES = {
     'ar': 'arabic',
 }
 
-@lru_cache(maxsize=1000)
+# Translations are kept in the llm_cache table too, so restarts and other
+# workers don't pay for the Google round trip again
+TRANSLATION_TTL = timedelta(days=30)
+
 def translate_to_english(text: str) -> str:
     """
     Translate text to English using Google Translate (via deep-translator).
@@ -29,43 +40,110 @@ def translate_to_english(text: str) -> str:
     Returns:
         The translated text in English, or the original text if translation fails
     """
+    try:
+        return _translate_or_raise(text)
+    except Exception as e:
+        logger.warning("Translation failed for %r: %s", text, e)
+        return text.lower()
+
+def _translate_or_raise(text: str) -> str:
+    """translate_to_english without the fallback, for callers that cache the result."""
     if not text or not text.strip():
         return text
     
     # Quick check: if text is already mostly English characters, don't translate
     # This saves API calls for English text
-    ascii_ratio = sum(1 for c in text if ord(c) < 128) / len(text)
-    if ascii_ratio > 0.8:  # More than 80% ASCII characters
+    if _is_mostly_ascii(text):
         return text.lower()
     
-    try:
-        translator = GoogleTranslator(source='auto', target='en')
-        translated = translator.translate(text)
-        print(f"Translated '{text}' → '{translated}'")
-        return translated.lower() if translated else text.lower()
-    except Exception as e:
-        print(f"Translation failed for '{text}': {e}")
-        return text.lower()
+    return _translate_cached(text.strip().lower())
+
+def _is_mostly_ascii(text: str) -> bool:
+    # Pure-ASCII text must stay untranslated: the SQL allergen prefilter
+    # (crud.get_allergen_candidate_recipe_ids) only matches it literally
+    if text.isascii():
+        return True
+    # Dropping non-ASCII characters in the codec counts them without a Python loop
+    ascii_ratio = len(text.encode('ascii', 'ignore')) / len(text)
+    return ascii_ratio > 0.8  # More than 80% ASCII characters
+
+@lru_cache(maxsize=1000)
+def _translate_cached(text: str) -> str:
+    # Failures raise, so they are neither memoised nor persisted
+    key = cache.content_key("translate", text)
+    stored = llm_cache.get_persisted(key)
+    if stored is not None:
+        return stored
+
+    translated = GoogleTranslator(source='auto', target='en').translate(text)
+    result = translated.lower() if translated else text
+    logger.debug("Translated %r -> %r", text, result)
+    llm_cache.persist(key, "google-translate", result, TRANSLATION_TTL)
+    return result
+
+# Quantities and measurement units stripped from ingredient text before matching
+_STRIP_PATTERN = re.compile(
+    r'\b\d+[\d\s\/\.\-]*\b'
+    r'|\b(?:cup|cups|tbsp|tsp|tablespoon|teaspoon|oz|lb|g|kg|ml|l|litre|liter|piece|pieces|clove|cloves)s?\b',
+    re.IGNORECASE,
+)
 
-def normalize_ingredient(ingredient_text: str) -> list[str]:
+def _strip_quantities(ingredient_text: str) -> str:
+    # Remove numbers, fractions and measurements like 'cup', 'tbsp', 'g', 'ml'
+    # in a single pass over the text
+    cleaned = _STRIP_PATTERN.sub('', ingredient_text)
+    return cleaned.strip()
+
+# deep-translator's translate_batch is a serial loop, so misses are fanned
+# out over a small shared pool instead
+_translation_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="lmeals-translate")
+
+def prefetch_translations(ingredient_texts: list[str]):
+    """
+    Translates every ingredient normalize_ingredient will ask for concurrently,
+    so a recipe costs about one Google round trip instead of one per ingredient.
+    Failures are left for translate_to_english, which logs them and falls back.
+    """
+    pending = set()
+    for text in ingredient_texts:
+        if not text:
+            continue
+        source = _strip_quantities(text) or text
+        if source.strip() and not _is_mostly_ascii(source):
+            pending.add(source.strip().lower())
+    if len(pending) > 1:
+        wait([_translation_pool.submit(_translate_cached, text) for text in pending])
+
+def normalize_ingredient(ingredient_text: str) -> tuple[str, ...]:
     """
     Normalize an ingredient by returning both the original and translated versions.
     Also extracts just the ingredient name (removes quantities/measurements).
+    Cached, since list pages re-check the same ingredient texts on every render,
+    but only once translation succeeded: a fallback result would otherwise skip
+    translation (and possibly miss an allergen) until it was evicted.
     
     Args:
         ingredient_text: The full ingredient text (e.g., "2 cups חלב")
         
     Returns:
-        List of normalized ingredient variants to check
+        Tuple of normalized ingredient variants to check
     """
     if not ingredient_text:
-        return []
-    
-    # Remove common measurements and quantities
-    # Pattern matches: numbers, fractions, measurements like 'cup', 'tbsp', 'g', 'ml', etc.
-    cleaned = re.sub(r'\b\d+[\d\s\/\.\-]*\b', '', ingredient_text)  # Remove numbers
-    cleaned = re.sub(r'\b(cup|cups|tbsp|tsp|tablespoon|teaspoon|oz|lb|g|kg|ml|l|litre|liter|piece|pieces|clove|cloves)s?\b', '', cleaned, flags=re.IGNORECASE)
-    cleaned = cleaned.strip()
+        return ()
+
+    try:
+        return _normalize_cached(ingredient_text)
+    except Exception as e:
+        logger.warning("Translation failed for %r: %s", ingredient_text, e)
+        return _normalize(ingredient_text, str.lower)
+
+@lru_cache(maxsize=4096)
+def _normalize_cached(ingredient_text: str) -> tuple[str, ...]:
+    # Translation failures raise through here, so they are never memoised
+    return _normalize(ingredient_text, _translate_or_raise)
+
+def _normalize(ingredient_text: str, translate) -> tuple[str, ...]:
+    cleaned = _strip_quantities(ingredient_text)
     
     results = []
     
@@ -78,11 +156,23 @@ def normalize_ingredient(ingredient_text: str) -> list[str]:
         results.append(cleaned.lower())
     
     # Add translated version
-    translated = translate_to_english(cleaned if cleaned else ingredient_text)
+    translated = translate(cleaned if cleaned else ingredient_text)
     if translated and translated not in results:
         results.append(translated)
     
-    return results
+    return tuple(results)
+
+@lru_cache(maxsize=32)
+def compile_allergen_matcher(allergen_keywords: tuple[str, ...]) -> re.Pattern:
+    """
+    Compiles all keywords into one word-bounded alternation, so each ingredient
+    variant is scanned once instead of once per keyword. Longer keywords come
+    first so the reported match is the most specific one. Keywords are lowered
+    here and normalize_ingredient lowers every variant, so no IGNORECASE.
+    """
+    keywords = sorted({k.lower() for k in allergen_keywords}, key=len, reverse=True)
+    alternation = "|".join(re.escape(k) for k in keywords)
+    return re.compile(rf'\b(?:{alternation})\b')
 
 def ingredient_contains_allergen(ingredient_text: str, allergen_keywords: list[str]) -> bool:
     """
@@ -99,14 +189,18 @@ def ingredient_contains_allergen(ingredient_text: str, allergen_keywords: list[s
     if not ingredient_text or not allergen_keywords:
         return False
     
+    if not isinstance(allergen_keywords, tuple):
+        allergen_keywords = tuple(allergen_keywords)
+    matcher = compile_allergen_matcher(allergen_keywords)
+
     # Get all normalized variants of the ingredient
     ingredient_variants = normalize_ingredient(ingredient_text)
     
     # Check if any variant contains any allergen keyword
     for variant in ingredient_variants:
-        for keyword in allergen_keywords:
-            if re.search(rf'\b{re.escape(keyword.lower())}\b', variant, re.IGNORECASE):
-                print(f"✓ Potential allergen detected: '{keyword}' found in '{variant}' (original: '{ingredient_text}')")
-                return True
+        match = matcher.search(variant)
+        if match:
+            logger.debug("Potential allergen detected: %r found in %r (original: %r)", match.group(0), variant, ingredient_text)
+            return True
     
     return False
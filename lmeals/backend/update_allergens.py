@@ -3,6 +3,7 @@ Script to update existing allergen keywords in the database.
 Run this to fix the "milk" allergen that currently only has ["milk"] as keywords.
 """
 import sys
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, '/config/lmeals/backend')
 
 from database import SessionLocal
@@ -15,19 +16,20 @@ def update_allergen_keywords():
         # Get all allergens
         allergens = crud.get_allergens(db)
         
-        for allergen in allergens:
+        # Regenerate keywords concurrently; the LLM rate limiter still paces the calls
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            expanded = list(executor.map(llm.expand_allergen_keywords, [a.name for a in allergens]))
+        
+        for allergen, new_keywords in zip(allergens, expanded):
             print(f"\nProcessing allergen: {allergen.name}")
             print(f"Current keywords: {allergen.keywords}")
-            
-            # Regenerate keywords
-            new_keywords = llm.expand_allergen_keywords(allergen.name)
             print(f"New keywords: {new_keywords}")
             
-            # Update in database
+            # Staged in the session; written in one commit below
             allergen.keywords = new_keywords
-            db.commit()
-            print(f"✓ Updated {allergen.name} in database")
+            print(f"✓ Updated {allergen.name}")
         
+        db.commit()
         print("\n✅ All allergens updated successfully!")
         
     except Exception as e:
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Recipe, ScrapeRequest, ScrapeResponse, MultiRecipeResponse, Allergen, GroqSettings, MealPlanEntry } from './types';
+import { Recipe, RecipeListItem, ScrapeRequest, ScrapeResponse, MultiRecipeResponse, Allergen, GroqSettings, MealPlanEntry } from './types';
 
 const API_BASE_URL = 'api';
 
@@ -8,11 +8,17 @@ const api = axios.create({
 });
 
 // Recipe Endpoints
-export const getRecipes = async (): Promise<Recipe[]> => {
+export const getRecipes = async (): Promise<RecipeListItem[]> => {
     const response = await api.get('/recipes');
     return response.data;
 };
 
+// Ids of recipes whose title or ingredients mention the search term
+export const searchRecipeIds = async (query: string): Promise<number[]> => {
+    const response = await api.get('/recipes/search', { params: { q: query } });
+    return response.data;
+};
+
 export const getRecipe = async (id: number): Promise<Recipe> => {
     const response = await api.get(`/recipes/${id}`);
     return response.data;
@@ -65,7 +71,7 @@ export const updateRecipeWithAi = async (id: number): Promise<Recipe> => {
     return response.data;
 };
 
-export const getFavoriteRecipes = async (): Promise<Recipe[]> => {
+export const getFavoriteRecipes = async (): Promise<RecipeListItem[]> => {
     const response = await api.get('/recipes/favorites');
     return response.data;
 };
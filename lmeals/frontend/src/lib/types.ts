@@ -14,6 +14,7 @@ export interface Recipe {
   yield_unit?: string;
   instruction_template?: string[] | null;
   image_url: string | null;
+  image_url_small?: string | null;
   source_url: string;
   notes: string | null;
   created_at: string;
@@ -23,6 +24,23 @@ export interface Recipe {
   has_allergens?: boolean;
 }
 
+// Recipe card returned by the list endpoints; the full recipe comes from /recipes/{id}
+export interface RecipeListItem {
+  id: number;
+  title: string;
+  prep_time: string | null;
+  cook_time: string | null;
+  active_time?: string | null;
+  total_time?: string | null;
+  servings?: string;
+  yield_unit?: string;
+  image_url: string | null;
+  image_url_small?: string | null;
+  is_favorite?: boolean;
+  created_at: string;
+  has_allergens?: boolean;
+}
+
 export interface Allergen {
   id: number;
   name: string;
@@ -1,16 +1,17 @@
 import { useState, useEffect, useMemo } from 'react';
 import { Link } from 'react-router-dom';
 import { Search, Plus, Filter, Clock, Users, ArrowRight } from 'lucide-react';
-import { getRecipes, getAllergens } from '../lib/api';
-import { Recipe, Allergen } from '../lib/types';
+import { getRecipes, getAllergens, searchRecipeIds } from '../lib/api';
+import { RecipeListItem, Allergen } from '../lib/types';
 import RecipeCard from '../components/RecipeCard';
 import AddRecipeModal from '../components/AddRecipeModal';
 import { parseTimeToMinutes, formatMinutes } from '../lib/utils';
 import { formatServings } from '../lib/scaling';
 
 const Dashboard = () => {
-  const [recipes, setRecipes] = useState<Recipe[]>([]);
+  const [recipes, setRecipes] = useState<RecipeListItem[]>([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [matchingIds, setMatchingIds] = useState<Set<number> | null>(null);
   const [activeFilter, setActiveFilter] = useState('All');
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [loading, setLoading] = useState(true);
@@ -32,16 +33,38 @@ const Dashboard = () => {
     }
   };
 
+  // Cards carry no ingredients, so ingredient matches are looked up on the server
+  useEffect(() => {
+    const term = searchTerm.trim();
+    if (!term) {
+      setMatchingIds(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const ids = await searchRecipeIds(term);
+        if (!cancelled) setMatchingIds(new Set(ids));
+      } catch (err) {
+        console.error(err);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchTerm]);
+
   const filteredRecipes = useMemo(() => {
     return recipes.filter(recipe => {
       const matchesSearch = recipe.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        recipe.ingredients.some(i => i.text.toLowerCase().includes(searchTerm.toLowerCase()));
+        (matchingIds?.has(recipe.id) ?? false);
 
       if (activeFilter === 'All') return matchesSearch;
       // Basic category matching logic (can be expanded)
       return matchesSearch;
     });
-  }, [recipes, searchTerm, activeFilter]);
+  }, [recipes, searchTerm, matchingIds, activeFilter]);
 
   // Recipe of the day logic
   const recipeOfTheDay = useMemo(() => {
@@ -172,7 +195,7 @@ const Dashboard = () => {
               key={recipe.id}
               id={recipe.id}
               title={recipe.title}
-              imageUrl={recipe.image_url ?? undefined}
+              imageUrl={recipe.image_url_small || recipe.image_url || undefined}
               hasAllergens={recipe.has_allergens || false}
               cookTime={recipe.cook_time ?? undefined}
               prepTime={recipe.prep_time ?? undefined}
@@ -1,11 +1,10 @@
 import { useState, useEffect } from 'react';
-import { getFavoriteRecipes, getAllergens } from '../lib/api';
-import { Recipe, Allergen } from '../lib/types';
+import { getFavoriteRecipes } from '../lib/api';
+import { RecipeListItem } from '../lib/types';
 import RecipeCard from '../components/RecipeCard';
 
 const FavoritesPage = () => {
-  const [recipes, setRecipes] = useState<Recipe[]>([]);
-  const [allergens, setAllergens] = useState<Allergen[]>([]);
+  const [recipes, setRecipes] = useState<RecipeListItem[]>([]);
   const [removingIds, setRemovingIds] = useState<Set<number>>(new Set());
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -14,12 +13,7 @@ const FavoritesPage = () => {
     const fetchFavorites = async () => {
       try {
         setLoading(true);
-        const [favoriteRecipes, allergensData] = await Promise.all([
-          getFavoriteRecipes(),
-          getAllergens()
-        ]);
-        setRecipes(favoriteRecipes);
-        setAllergens(allergensData);
+        setRecipes(await getFavoriteRecipes());
       } catch (err) {
         setError('Failed to load favorite recipes.');
         console.error(err);
@@ -30,20 +24,6 @@ const FavoritesPage = () => {
     fetchFavorites();
   }, []);
 
-  // Check if a recipe has allergens
-  const checkForAllergens = (recipe: Recipe): boolean => {
-    if (recipe.has_allergens !== undefined && recipe.has_allergens !== null) {
-      return recipe.has_allergens;
-    }
-
-    if (!allergens.length) return false;
-    const recipeIngredients = recipe.ingredients.map(i => i.text.toLowerCase());
-    return allergens.some(allergen => {
-      const checks = [allergen.name.toLowerCase(), ...(allergen.keywords || []).map(k => k.toLowerCase())];
-      return recipeIngredients.some(ingredient => checks.some(check => ingredient.includes(check)));
-    });
-  };
-
   return (
     <div className="p-4 md:p-8 lg:px-12 max-w-7xl mx-auto">
       <h1 className="text-3xl md:text-4xl font-extrabold text-slate-800 tracking-tight mb-8">Your Favorite Recipes</h1>
@@ -67,8 +47,8 @@ const FavoritesPage = () => {
               <RecipeCard
                 id={recipe.id}
                 title={recipe.title}
-                imageUrl={recipe.image_url || undefined}
-                hasAllergens={checkForAllergens(recipe)}
+                imageUrl={recipe.image_url_small || recipe.image_url || undefined}
+                hasAllergens={recipe.has_allergens || false}
                 cookTime={recipe.cook_time || undefined}
                 prepTime={recipe.prep_time || undefined}
                 servings={recipe.servings || undefined}
@@ -13,7 +13,7 @@ import {
   TouchSensor,
 } from '@dnd-kit/core';
 import { getRecipes, getMealPlanEntries, createMealPlanEntry, deleteMealPlanEntry } from '../lib/api';
-import { Recipe, MealPlanEntry } from '../lib/types';
+import { RecipeListItem, MealPlanEntry } from '../lib/types';
 import { X, ChevronLeft, ChevronRight, Calendar as CalendarIcon, ChefHat, Plus, Coffee, Sun, Moon, IceCream, Search, Filter } from 'lucide-react';
 import { Link } from 'react-router-dom';
 
@@ -30,7 +30,7 @@ const MEAL_SLOTS = [
 // --- Helper Components ---
 
 // Sidebar Recipe Item
-const DraggableRecipe = ({ recipe }: { recipe: Recipe }) => {
+const DraggableRecipe = ({ recipe }: { recipe: RecipeListItem }) => {
   const { attributes, listeners, setNodeRef, isDragging } = useDraggable({
     id: `recipe-${recipe.id}`,
     data: { type: 'new', recipe }
@@ -151,7 +151,7 @@ const DayColumn = ({ date, mealPlan, onDelete }: { date: Date, mealPlan: Record<
 // --- Main Component ---
 
 const MealPlan = () => {
-  const [recipes, setRecipes] = useState<Recipe[]>([]);
+  const [recipes, setRecipes] = useState<RecipeListItem[]>([]);
   const [mealPlan, setMealPlan] = useState<Record<string, MealPlanEntry[]>>({});
   const [showRecipes, setShowRecipes] = useState(false);
   const [currentWeekStart, setCurrentWeekStart] = useState<Date>(() => {
@@ -226,7 +226,7 @@ const MealPlan = () => {
 
       if (!date || !mealType) return;
 
-      const recipe: Recipe = active.data.current.recipe || active.data.current;
+      const recipe: RecipeListItem = active.data.current.recipe || active.data.current;
 
       try {
         const newEntry = await createMealPlanEntry(date, recipe.id, mealType);
@@ -236,7 +236,8 @@ const MealPlan = () => {
           const entry: MealPlanEntry = {
             id: newEntry.id,
             date: date,
-            recipe: recipe,
+            // The created entry carries the full recipe; the card only has a summary
+            recipe: newEntry.recipe,
             recipe_id: recipe.id,
             meal_type: mealType
           };